@@ -3,30 +3,40 @@ Voice Engine Entry Point
 FastAPI application for handling Twilio WebSocket connections and Gemini Live API.
 """
 
-import os
-import json
+import time
+import asyncio
 import uuid
+import queue
 import logging
+from logging.handlers import QueueHandler, QueueListener
+from collections import OrderedDict
 from pathlib import Path
 from dotenv import load_dotenv
 
 # Load .env from project root
 env_path = Path(__file__).resolve().parent.parent.parent / ".env"
 load_dotenv(env_path)
-from fastapi import FastAPI, WebSocket, Request, HTTPException
+from fastapi import FastAPI, WebSocket, Request, HTTPException, Depends
 from fastapi.responses import Response
+from starlette.datastructures import URL
 from starlette.websockets import WebSocketState
 from contextlib import asynccontextmanager
-from pydantic import BaseModel
+from typing import TYPE_CHECKING
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict
 
+import orjson
 import redis.asyncio as redis
-from twilio.rest import Client as TwilioClient
 
-from src.brain.gemini_client import GeminiLiveClient
+from src.brain.gemini_client import GeminiLiveClient, get_genai_client
 from src.brain.prompts import build_outbound_prompt
 from src.stream.twilio_handler import TwilioMediaHandler
+from src.config import settings
 from src.db import get_db_client, PostgresClient
 
+if TYPE_CHECKING:
+    from twilio.rest import Client as TwilioClient
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -38,8 +48,10 @@ logger = logging.getLogger(__name__)
 # Pydantic models for outbound call API
 class InitiateOutboundCallRequest(BaseModel):
     """Request to start an outbound call."""
-    request_id: str  # UUID of existing reservation_request
-    restaurant_id: str  # UUID of restaurant to call
+    model_config = ConfigDict(str_strip_whitespace=True, extra="forbid")
+
+    request_id: UUID  # UUID of existing reservation_request
+    restaurant_id: UUID  # UUID of restaurant to call
 
 
 class InitiateOutboundCallResponse(BaseModel):
@@ -48,9 +60,105 @@ class InitiateOutboundCallResponse(BaseModel):
     status: str
 
 
+# Pre-encoded TwiML templates (filled with bytes via %-formatting per request)
+INCOMING_TWIML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Say>Please wait while we connect you.</Say>
+    <Connect>
+        <Stream url="%b" />
+    </Connect>
+</Response>"""
+
+OUTBOUND_TWIML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Connect>
+        <Stream url="%b?context_id=%b">
+            <Parameter name="call_type" value="outbound" />
+            <Parameter name="request_id" value="%b" />
+            <Parameter name="restaurant_id" value="%b" />
+            <Parameter name="context_id" value="%b" />
+        </Stream>
+    </Connect>
+</Response>"""
+
+CONFIG_ERROR_TWIML = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b"<Response><Say>Configuration error. Goodbye.</Say></Response>"
+)
+
+
+# Set PUBLIC_SCHEME=https when served behind a TLS-terminating proxy
+PUBLIC_HTTPS = settings.public_scheme == "https"
+
+
+def _is_public_https(request: Request, host: str) -> bool:
+    """Whether the public URL Twilio reaches us on is https."""
+    return PUBLIC_HTTPS or request.url.scheme == "https" or "trycloudflare.com" in host
+
+
+def _public_url_for(request: Request, name: str, secure_scheme: str, plain_scheme: str) -> URL:
+    """Absolute URL for a named route, with the scheme Twilio should use."""
+    url = request.url_for(name)
+    return url.replace(scheme=secure_scheme if _is_public_https(request, url.netloc) else plain_scheme)
+
+
+def public_stream_url(request: Request) -> URL:
+    """Dependency: public ws/wss URL of the Twilio media stream endpoint."""
+    return _public_url_for(request, "twilio_websocket", "wss", "ws")
+
+
 # In-memory fallback for call context when Redis is unavailable
 _call_context_store: dict[str, dict] = {}
 
+# Short TTL for cached restaurant/user rows used to set up outbound calls
+RECORD_CACHE_TTL_SECONDS = 120
+
+# Strong references to fire-and-forget tasks so they aren't garbage collected
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _run_in_background(coro, description: str) -> asyncio.Task:
+    """Schedule a coroutine without awaiting it; failures are logged."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+
+    def _done(t: asyncio.Task) -> None:
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.error(f"Background {description} failed: {t.exception()}")
+
+    task.add_done_callback(_done)
+    return task
+
+
+# Process-local cache in front of Redis: context_id -> (expires_at, context).
+# Only found contexts are cached: the cache is per worker, so a cached miss
+# could hide a context another worker writes moments later.
+CALL_CONTEXT_TTL_SECONDS = 300
+LOCAL_CONTEXT_CACHE_SIZE = 1024
+_local_context_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+
+def _local_context_get(context_id: str) -> dict | None:
+    """Look up a context in the local cache."""
+    entry = _local_context_cache.get(context_id)
+    if entry is None:
+        return None
+    expires_at, context = entry
+    if expires_at < time.monotonic():
+        del _local_context_cache[context_id]
+        return None
+    _local_context_cache.move_to_end(context_id)
+    return context
+
+
+def _local_context_put(context_id: str, context: dict, ttl: float) -> None:
+    """Cache a context with LRU eviction."""
+    _local_context_cache[context_id] = (time.monotonic() + ttl, context)
+    _local_context_cache.move_to_end(context_id)
+    if len(_local_context_cache) > LOCAL_CONTEXT_CACHE_SIZE:
+        _local_context_cache.popitem(last=False)
+
 
 def get_database_client() -> PostgresClient | None:
     """Initialize database client from environment variables."""
@@ -59,9 +167,10 @@ def get_database_client() -> PostgresClient | None:
 
 async def get_redis_client() -> redis.Redis | None:
     """Initialize Redis client from environment variables."""
-    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+    redis_url = settings.redis_url
     try:
-        client = redis.from_url(redis_url, decode_responses=True)
+        # Keep raw bytes: orjson parses them directly without a str decode pass
+        client = redis.from_url(redis_url, decode_responses=False)
         await client.ping()
         logger.info(f"Connected to Redis at {redis_url}")
         return client
@@ -70,9 +179,41 @@ async def get_redis_client() -> redis.Redis | None:
         return None
 
 
+def get_twilio_client() -> "TwilioClient | None":
+    """Initialize Twilio REST client from environment variables."""
+    if not settings.twilio_account_sid or not settings.twilio_auth_token:
+        logger.warning("Twilio credentials not set - outbound calls disabled")
+        return None
+    # Imported lazily: twilio.rest is only needed for outbound calls
+    from twilio.rest import Client as TwilioClient
+
+    # One client per process so its HTTP session (and TLS connections) is reused
+    return TwilioClient(settings.twilio_account_sid, settings.twilio_auth_token)
+
+
+def start_queue_logging() -> QueueListener:
+    """
+    Route root log records through a queue so handlers that write to
+    stderr/files run on a background thread instead of the event loop.
+    """
+    root = logging.getLogger()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    return listener
+
+
+def stop_queue_logging(listener: QueueListener) -> None:
+    """Flush queued log records and restore the original root handlers."""
+    listener.stop()
+    logging.getLogger().handlers = list(listener.handlers)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup/shutdown."""
+    log_listener = start_queue_logging()
     logger.info("Starting Voice Engine...")
 
     # Initialize database client
@@ -83,16 +224,28 @@ async def lifespan(app: FastAPI):
     # Initialize Redis connection pool
     app.state.redis = await get_redis_client()
 
+    # Initialize Twilio REST client (shared across outbound calls)
+    app.state.twilio = get_twilio_client()
+
+    # Pre-warm the shared Gemini client so the first call doesn't pay for it
+    if settings.gemini_api_key:
+        get_genai_client(settings.gemini_api_key)
+        logger.info("Gemini client initialized")
+
     yield
 
     # Cleanup resources
     logger.info("Shutting down Voice Engine...")
+    # Let in-flight background DB writes finish before closing the client
+    if _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
     if app.state.db:
         app.state.db.close()
         logger.info("Database connection closed")
     if app.state.redis:
         await app.state.redis.close()
         logger.info("Redis connection closed")
+    stop_queue_logging(log_listener)
 
 
 app = FastAPI(
@@ -109,26 +262,14 @@ async def health_check():
 
 
 @app.post("/ws/twilio")
-async def twilio_incoming_call(request: Request):
+async def twilio_incoming_call(stream_url: URL = Depends(public_stream_url)):
     """
     Handle incoming Twilio call webhook.
     Returns TwiML to connect the call to our WebSocket stream.
     """
-    # Get the host from the request to build WebSocket URL
-    host = request.headers.get("host", "localhost:8000")
-
-    # Use wss:// for production (https), ws:// for local
-    protocol = "wss" if "trycloudflare.com" in host or "https" in str(request.url) else "ws"
-
-    twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say>Please wait while we connect you.</Say>
-    <Connect>
-        <Stream url="{protocol}://{host}/ws/twilio/stream" />
-    </Connect>
-</Response>"""
+    twiml = INCOMING_TWIML % str(stream_url).encode()
 
-    logger.info(f"Incoming call - connecting to {protocol}://{host}/ws/twilio/stream")
+    logger.info(f"Incoming call - connecting to {stream_url}")
     return Response(content=twiml, media_type="application/xml")
 
 
@@ -151,18 +292,8 @@ async def twilio_websocket(websocket: WebSocket):
         call_context = await _get_call_context(app.state.redis, context_id)
         if call_context:
             logger.info(f"Outbound call with context: {context_id}")
-            # Build system prompt from context
-            system_prompt = build_outbound_prompt(
-                user_name=call_context.get("user_name", "the customer"),
-                restaurant_name=call_context.get("restaurant_name", "the restaurant"),
-                party_size=call_context.get("party_size", 2),
-                preferred_date=call_context.get("requested_date", ""),
-                preferred_time=call_context.get("time_range_start", ""),
-                time_range_start=call_context.get("time_range_start", ""),
-                time_range_end=call_context.get("time_range_end", ""),
-                contact_phone=call_context.get("contact_phone", ""),
-                special_requests=call_context.get("special_requests", ""),
-            )
+            # Build system prompt from context (cached for stream reconnects)
+            system_prompt = _build_system_prompt(call_context)
 
     # Use shared db client from app.state
     handler = TwilioMediaHandler(
@@ -180,13 +311,66 @@ async def twilio_websocket(websocket: WebSocket):
             await websocket.close()
 
 
+def _build_system_prompt(call_context: dict) -> str:
+    """Build the system prompt for an outbound call context."""
+    time_range_start = call_context.get("time_range_start", "")
+    return build_outbound_prompt(
+        user_name=call_context.get("user_name", "the customer"),
+        restaurant_name=call_context.get("restaurant_name", "the restaurant"),
+        party_size=call_context.get("party_size", 2),
+        preferred_date=call_context.get("requested_date", ""),
+        preferred_time=time_range_start,
+        time_range_start=time_range_start,
+        time_range_end=call_context.get("time_range_end", ""),
+        contact_phone=call_context.get("contact_phone", ""),
+        special_requests=call_context.get("special_requests", ""),
+    )
+
+
+async def _fetch_record_cached(
+    redis_client: redis.Redis | None, db: PostgresClient, table: str, record_id: str
+) -> dict | None:
+    """
+    Fetch a row by id, read-through cached in Redis for a short TTL.
+
+    Only for rarely-changing rows (restaurants, users) - stale reads are
+    bounded by RECORD_CACHE_TTL_SECONDS.
+    """
+    key = f"cache:{table}:{record_id}"
+    if redis_client:
+        try:
+            data = await redis_client.get(key)
+            if data:
+                return orjson.loads(data)
+        except Exception as e:
+            logger.warning(f"Failed to read {key} from Redis: {e}")
+
+    result = await db.table(table).select("*").eq("id", record_id).execute_async()
+    if not result.data:
+        return None
+
+    record = result.data[0]
+    if redis_client:
+        _run_in_background(
+            redis_client.setex(key, RECORD_CACHE_TTL_SECONDS, orjson.dumps(record, default=str)),
+            f"cache write for {key}",
+        )
+    return record
+
+
 async def _get_call_context(redis_client: redis.Redis | None, context_id: str) -> dict | None:
-    """Retrieve call context from Redis or in-memory fallback."""
+    """Retrieve call context from the local cache, Redis, or in-memory fallback."""
+    context = _local_context_get(context_id)
+    if context is not None:
+        return context
+
     if redis_client:
         try:
             data = await redis_client.get(f"call_context:{context_id}")
             if data:
-                return json.loads(data)
+                context = orjson.loads(data)
+                _local_context_put(context_id, context, CALL_CONTEXT_TTL_SECONDS)
+                return context
         except Exception as e:
             logger.warning(f"Failed to get context from Redis: {e}")
 
@@ -196,12 +380,14 @@ async def _get_call_context(redis_client: redis.Redis | None, context_id: str) -
 
 async def _store_call_context(redis_client: redis.Redis | None, context_id: str, context: dict) -> None:
     """Store call context in Redis or in-memory fallback."""
+    _local_context_put(context_id, context, CALL_CONTEXT_TTL_SECONDS)
+
     if redis_client:
         try:
             await redis_client.setex(
                 f"call_context:{context_id}",
-                300,  # 5 minute TTL
-                json.dumps(context)
+                CALL_CONTEXT_TTL_SECONDS,
+                orjson.dumps(context)
             )
             return
         except Exception as e:
@@ -226,8 +412,18 @@ async def initiate_outbound_call(request: Request, body: InitiateOutboundCallReq
     if not db:
         raise HTTPException(status_code=503, detail="Database not available")
 
-    # Validate and fetch reservation request
-    request_result = db.table("reservation_requests").select("*").eq("id", body.request_id).execute()
+    # IDs are validated as UUIDs by the request model; the DB layer takes strings
+    request_id = str(body.request_id)
+    restaurant_id = str(body.restaurant_id)
+
+    # Fetch reservation request and restaurant concurrently (independent lookups).
+    # The request's status changes during a call, so only the restaurant is cached.
+    request_result, restaurant = await asyncio.gather(
+        db.table("reservation_requests").select("*").eq("id", request_id).execute_async(),
+        _fetch_record_cached(app.state.redis, db, "restaurants", restaurant_id),
+    )
+
+    # Validate reservation request
     if not request_result.data:
         raise HTTPException(status_code=404, detail="Reservation request not found")
 
@@ -238,43 +434,34 @@ async def initiate_outbound_call(request: Request, body: InitiateOutboundCallReq
             detail=f"Request status is '{reservation_request.get('status')}', must be pending or in_progress"
         )
 
-    # Validate and fetch restaurant
-    restaurant_result = db.table("restaurants").select("*").eq("id", body.restaurant_id).execute()
-    if not restaurant_result.data:
+    # Validate restaurant
+    if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
-    restaurant = restaurant_result.data[0]
     if not restaurant.get("phone"):
         raise HTTPException(status_code=400, detail="Restaurant has no phone number")
 
     # Fetch user for name
-    user_result = db.table("users").select("*").eq("id", reservation_request.get("user_id")).execute()
+    user_id = reservation_request.get("user_id")
+    user = await _fetch_record_cached(app.state.redis, db, "users", str(user_id)) if user_id else None
     user_name = "the customer"
     contact_phone = ""
-    if user_result.data:
-        user = user_result.data[0]
+    if user:
         user_name = user.get("name", "the customer")
         contact_phone = user.get("phone", "")
 
     # Generate context ID and store context
     context_id = str(uuid.uuid4())
 
-    # Convert date/time objects to strings for JSON serialization
+    # str() of date/time objects is already their ISO format
     requested_date = reservation_request.get("requested_date", "")
     time_range_start = reservation_request.get("time_range_start", "")
     time_range_end = reservation_request.get("time_range_end", "")
 
-    if hasattr(requested_date, 'isoformat'):
-        requested_date = requested_date.isoformat()
-    if hasattr(time_range_start, 'isoformat'):
-        time_range_start = time_range_start.isoformat()
-    if hasattr(time_range_end, 'isoformat'):
-        time_range_end = time_range_end.isoformat()
-
     call_context = {
         "call_type": "outbound",
-        "request_id": body.request_id,
-        "restaurant_id": body.restaurant_id,
+        "request_id": request_id,
+        "restaurant_id": restaurant_id,
         "restaurant_name": restaurant.get("name", "the restaurant"),
         "user_name": user_name,
         "party_size": reservation_request.get("party_size", 2),
@@ -288,34 +475,39 @@ async def initiate_outbound_call(request: Request, body: InitiateOutboundCallReq
     await _store_call_context(app.state.redis, context_id, call_context)
     logger.info(f"Stored call context: {context_id}")
 
-    # Get host for TwiML webhook URL
-    host = request.headers.get("host", "localhost:8000")
-    protocol = "https" if "trycloudflare.com" in host else "http"
+    # TwiML webhook URL Twilio calls when the restaurant answers
+    twiml_url = _public_url_for(
+        request, "twilio_outbound_twiml", "https", "http"
+    ).include_query_params(context_id=context_id)
 
-    # Initialize Twilio client
-    twilio_account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    twilio_auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-    twilio_phone_number = os.getenv("TWILIO_PHONE_NUMBER")
+    # Reuse the process-wide Twilio client (created lazily if lifespan didn't run)
+    twilio_client = getattr(app.state, "twilio", None)
+    if twilio_client is None:
+        twilio_client = app.state.twilio = get_twilio_client()
+    twilio_phone_number = settings.twilio_phone_number
 
-    if not all([twilio_account_sid, twilio_auth_token, twilio_phone_number]):
+    if twilio_client is None or not twilio_phone_number:
         raise HTTPException(status_code=503, detail="Twilio credentials not configured")
 
-    twilio_client = TwilioClient(twilio_account_sid, twilio_auth_token)
-
     try:
-        # Create the outbound call
-        call = twilio_client.calls.create(
+        # Create the outbound call (blocking HTTP request, so off the event loop)
+        call = await asyncio.to_thread(
+            twilio_client.calls.create,
             to=restaurant.get("phone"),
             from_=twilio_phone_number,
-            url=f"{protocol}://{host}/ws/twilio/outbound-twiml?context_id={context_id}",
+            url=str(twiml_url),
         )
 
         logger.info(f"Initiated outbound call: {call.sid} to {restaurant.get('phone')}")
 
-        # Update reservation request status
-        db.table("reservation_requests").update({
-            "status": "in_progress"
-        }).eq("id", body.request_id).execute()
+        # Update reservation request status in the background - the caller
+        # only needs the call_sid
+        _run_in_background(
+            db.table("reservation_requests").update({
+                "status": "in_progress"
+            }).eq("id", request_id).execute_async(),
+            f"status update for request {request_id}",
+        )
 
         return InitiateOutboundCallResponse(
             call_sid=call.sid,
@@ -328,7 +520,7 @@ async def initiate_outbound_call(request: Request, body: InitiateOutboundCallReq
 
 
 @app.post("/ws/twilio/outbound-twiml")
-async def twilio_outbound_twiml(request: Request):
+async def twilio_outbound_twiml(request: Request, stream_url: URL = Depends(public_stream_url)):
     """
     TwiML webhook for outbound calls.
     Called by Twilio when the restaurant answers.
@@ -337,36 +529,23 @@ async def twilio_outbound_twiml(request: Request):
     context_id = request.query_params.get("context_id")
     if not context_id:
         logger.error("Outbound TwiML called without context_id")
-        return Response(
-            content='<?xml version="1.0" encoding="UTF-8"?><Response><Say>Configuration error. Goodbye.</Say></Response>',
-            media_type="application/xml"
-        )
-
-    # Get the host from the request to build WebSocket URL
-    host = request.headers.get("host", "localhost:8000")
-    protocol = "wss" if "trycloudflare.com" in host or "https" in str(request.url) else "ws"
+        return Response(content=CONFIG_ERROR_TWIML, media_type="application/xml")
 
     # Retrieve context to include params in stream
     call_context = await _get_call_context(app.state.redis, context_id)
     if not call_context:
         logger.error(f"No context found for context_id: {context_id}")
-        return Response(
-            content='<?xml version="1.0" encoding="UTF-8"?><Response><Say>Configuration error. Goodbye.</Say></Response>',
-            media_type="application/xml"
-        )
+        return Response(content=CONFIG_ERROR_TWIML, media_type="application/xml")
 
     # Build TwiML with custom parameters
-    twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Connect>
-        <Stream url="{protocol}://{host}/ws/twilio/stream?context_id={context_id}">
-            <Parameter name="call_type" value="outbound" />
-            <Parameter name="request_id" value="{call_context.get('request_id', '')}" />
-            <Parameter name="restaurant_id" value="{call_context.get('restaurant_id', '')}" />
-            <Parameter name="context_id" value="{context_id}" />
-        </Stream>
-    </Connect>
-</Response>"""
+    context_id_bytes = context_id.encode()
+    twiml = OUTBOUND_TWIML % (
+        str(stream_url).encode(),
+        context_id_bytes,
+        str(call_context.get("request_id", "")).encode(),
+        str(call_context.get("restaurant_id", "")).encode(),
+        context_id_bytes,
+    )
 
     logger.info(f"Outbound call answered - connecting to stream with context: {context_id}")
     return Response(content=twiml, media_type="application/xml")
@@ -374,4 +553,14 @@ async def twilio_outbound_twiml(request: Request):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # "auto" picks uvloop + httptools (from uvicorn[standard]) when installed
+    # and falls back to asyncio/h11 elsewhere (e.g. Windows); no access log
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        ws="websockets",
+        access_log=False,
+    )
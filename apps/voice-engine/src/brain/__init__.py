@@ -1,3 +1,3 @@
-from .gemini_client import GeminiLiveClient
+from .gemini_client import GeminiLiveClient, get_genai_client
 
-__all__ = ["GeminiLiveClient"]
+__all__ = ["GeminiLiveClient", "get_genai_client"]
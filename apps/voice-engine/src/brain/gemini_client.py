@@ -3,18 +3,43 @@ Gemini Live API Client
 Handles real-time audio streaming with gemini-2.5-flash-native-audio.
 """
 
-import os
+import asyncio
 import logging
+import functools
 from typing import AsyncGenerator, Callable
 
 from google import genai
 from google.genai import types
 
 from .prompts import SYSTEM_PROMPT
+from ..config import settings
 from ..tools import ALL_TOOL_SCHEMAS
 
 logger = logging.getLogger(__name__)
 
+# 20 ms of Gemini output audio (24kHz, 16-bit mono) - one Twilio frame after transcoding
+OUTPUT_FRAME_BYTES = 960
+
+# 20 ms of input audio (16kHz, 16-bit mono). Smaller chunks are coalesced up
+# to this size, waiting at most SEND_COALESCE_SECONDS, before being sent.
+INPUT_FRAME_BYTES = 640
+SEND_COALESCE_SECONDS = 0.01
+
+# Tool declarations validated into SDK types once at import, so each session
+# config reuses them instead of re-parsing the schema dicts on every connect
+_LIVE_TOOLS = (types.Tool.model_validate({"function_declarations": ALL_TOOL_SCHEMAS}),)
+
+
+@functools.lru_cache(maxsize=None)
+def get_genai_client(api_key: str) -> genai.Client:
+    """
+    Get the process-wide genai client for an API key.
+
+    Live sessions can't be shared between calls (the system prompt is fixed
+    at connect time), but the underlying client and its HTTP setup can.
+    """
+    return genai.Client(api_key=api_key)
+
 
 class GeminiLiveClient:
     """
@@ -22,15 +47,22 @@ class GeminiLiveClient:
     Provides sub-800ms response times for natural conversation.
     """
 
-    def __init__(self, system_prompt: str | None = None):
+    def __init__(
+        self,
+        system_prompt: str | None = None,
+        output_frame_bytes: int = OUTPUT_FRAME_BYTES,
+    ):
         """
         Initialize the Gemini Live client.
 
         Args:
             system_prompt: Optional custom system prompt. If not provided,
                            uses the default SYSTEM_PROMPT from prompts.py.
+            output_frame_bytes: Output audio is coalesced into multiples of this
+                                size before being yielded (tunes latency vs.
+                                number of downstream sends).
         """
-        self.api_key = os.getenv("GEMINI_API_KEY")
+        self.api_key = settings.gemini_api_key
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
 
@@ -39,12 +71,27 @@ class GeminiLiveClient:
         self.model = "gemini-2.5-flash-native-audio-preview-09-2025"
         self.session = None
         self._session_context = None
-        self._on_audio_callback: Callable | None = None
         self._on_tool_call_callback: Callable | None = None
+        self._on_interrupted_callback: Callable | None = None
         self._system_prompt = system_prompt or SYSTEM_PROMPT
+        self._output_frame_bytes = output_frame_bytes
+        self._send_buf = bytearray()  # Input audio awaiting a coalesced send
+        self._send_flush_task: asyncio.Task | None = None
+        # Checked once per session so per-frame debug logs cost nothing when disabled
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+
+        # Live API session config, built once and reused across reconnects
+        self._config = {
+            "response_modalities": ["AUDIO"],
+            "system_instruction": self._system_prompt,
+            "tools": list(_LIVE_TOOLS),
+            # Enable transcriptions for logging
+            "input_audio_transcription": {},
+            "output_audio_transcription": {},
+        }
 
-        # Initialize the genai client
-        self._client = genai.Client(api_key=self.api_key)
+        # Reuse the shared genai client
+        self._client = get_genai_client(self.api_key)
 
     async def connect(self) -> None:
         """
@@ -55,22 +102,12 @@ class GeminiLiveClient:
             logger.warning("Session already connected, closing existing session")
             await self.close()
 
-        # Configure the Live API session
-        config = {
-            "response_modalities": ["AUDIO"],
-            "system_instruction": self._system_prompt,
-            "tools": [{"function_declarations": ALL_TOOL_SCHEMAS}],
-            # Enable transcriptions for logging
-            "input_audio_transcription": {},
-            "output_audio_transcription": {},
-        }
-
         logger.info(f"Connecting to Gemini Live API with model: {self.model}")
 
         # Create the async session context manager
         self._session_context = self._client.aio.live.connect(
             model=self.model,
-            config=config
+            config=self._config
         )
 
         # Enter the context to establish connection
@@ -90,13 +127,56 @@ class GeminiLiveClient:
         if not audio_chunk:
             return
 
-        logger.debug(f"Sending audio to Gemini: {len(audio_chunk)} bytes")
+        # Whole frames go straight out; sub-frame chunks are batched so
+        # tiny inputs don't each cost a websocket write
+        if not self._send_buf and len(audio_chunk) >= INPUT_FRAME_BYTES:
+            await self._send_realtime_audio(audio_chunk)
+            return
+
+        self._send_buf += audio_chunk
+        if len(self._send_buf) >= INPUT_FRAME_BYTES:
+            self._cancel_send_flush()
+            await self._flush_send_buf()
+        elif self._send_flush_task is None:
+            self._send_flush_task = asyncio.create_task(self._delayed_send_flush())
+            self._send_flush_task.add_done_callback(self._send_flush_done)
+
+    async def _delayed_send_flush(self) -> None:
+        """Flush buffered input audio once the coalescing window has passed."""
+        await asyncio.sleep(SEND_COALESCE_SECONDS)
+        self._send_flush_task = None
+        await self._flush_send_buf()
+
+    @staticmethod
+    def _send_flush_done(task: asyncio.Task) -> None:
+        """Log a failed delayed flush (nothing else awaits the task)."""
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error sending buffered audio to Gemini: {task.exception()}")
+
+    def _cancel_send_flush(self) -> None:
+        """Cancel a pending delayed flush."""
+        if self._send_flush_task is not None:
+            self._send_flush_task.cancel()
+            self._send_flush_task = None
+
+    async def _flush_send_buf(self) -> None:
+        """Send any buffered input audio as one chunk."""
+        if not self._send_buf or self.session is None:
+            return
+        data = bytes(self._send_buf)
+        self._send_buf.clear()
+        await self._send_realtime_audio(data)
+
+    async def _send_realtime_audio(self, data: bytes) -> None:
+        """Send one chunk of input audio to Gemini."""
+        if self._debug:
+            logger.debug("Sending audio to Gemini: %d bytes", len(data))
 
         # Send audio as realtime input with proper MIME type
         # Gemini expects 16kHz, 16-bit PCM, little-endian
         await self.session.send_realtime_input(
             media=types.Blob(
-                data=audio_chunk,
+                data=data,
                 mime_type="audio/pcm;rate=16000"
             )
         )
@@ -116,10 +196,15 @@ class GeminiLiveClient:
             turn_complete=True
         )
 
-    async def receive_audio(self) -> AsyncGenerator[bytes, None]:
+    async def receive_audio(self) -> AsyncGenerator[memoryview, None]:
         """
         Receive audio responses from Gemini.
-        Yields 24kHz LPCM16 audio chunks (Gemini's native output format).
+        Yields 24kHz LPCM16 audio chunks (Gemini's native output format) as
+        memoryviews, so consumers can slice without copying; call .tobytes()
+        only where real bytes are required.
+
+        Small chunks are coalesced so each yield is a whole number of
+        output frames; the partial remainder is flushed when the turn ends.
 
         Also handles tool calls by invoking the registered callback.
 
@@ -131,6 +216,9 @@ class GeminiLiveClient:
             logger.warning("Cannot receive audio: session not connected")
             return
 
+        frame_bytes = self._output_frame_bytes
+        pending = bytearray()  # Partial frame carried between chunks
+
         try:
             # Continuously receive turns from Gemini
             # Each call to session.receive() returns one turn's worth of responses
@@ -139,49 +227,79 @@ class GeminiLiveClient:
                     logger.info("Session closed, stopping receive loop")
                     break
 
-                logger.debug("Waiting for next turn from Gemini...")
+                debug = self._debug
+                if debug:
+                    logger.debug("Waiting for next turn from Gemini...")
                 turn = self.session.receive()
 
                 async for response in turn:
-                    # Log the full response structure for debugging
-                    logger.debug(f"Gemini response type: {type(response)}")
-                    logger.debug(f"Has tool_call: {bool(response.tool_call)}")
-                    logger.debug(f"Has server_content: {bool(response.server_content)}")
+                    tool_call = response.tool_call
+                    sc = response.server_content
+                    if debug:
+                        logger.debug(
+                            "Gemini response: tool_call=%s server_content=%s",
+                            bool(tool_call), bool(sc),
+                        )
 
                     # Handle tool calls
-                    if response.tool_call:
-                        logger.info(f"Received tool call: {response.tool_call}")
-                        for fc in response.tool_call.function_calls:
+                    if tool_call:
+                        logger.info("Received tool call: %s", tool_call)
+                        for fc in tool_call.function_calls:
                             if self._on_tool_call_callback:
                                 self._on_tool_call_callback(fc.name, fc.id, fc.args)
 
+                    if not sc:
+                        continue
+
                     # Log any transcripts from user input
-                    if response.server_content:
-                        sc = response.server_content
-                        # Log key fields
-                        if sc.turn_complete:
-                            logger.info(f"Turn complete. interrupted={sc.interrupted}")
-                        if sc.input_transcription:
-                            logger.info(f"[USER SAID]: {sc.input_transcription}")
-                        if sc.interrupted:
-                            logger.info(f"Gemini was interrupted by user")
-
-                        # Check for output transcription (what AI said)
-                        if hasattr(response.server_content, 'output_transcription') and response.server_content.output_transcription:
-                            logger.info(f"[AI SAID]: {response.server_content.output_transcription}")
+                    if sc.turn_complete:
+                        logger.info("Turn complete. interrupted=%s", sc.interrupted)
+                    if sc.input_transcription:
+                        logger.info("[USER SAID]: %s", sc.input_transcription)
+                    if sc.interrupted:
+                        logger.info("Gemini was interrupted by user")
+                        pending.clear()  # Stale partial frame
+                        if self._on_interrupted_callback:
+                            self._on_interrupted_callback()
+
+                    # Check for output transcription (what AI said)
+                    if sc.output_transcription:
+                        logger.info("[AI SAID]: %s", sc.output_transcription)
 
                     # Handle audio responses
-                    if response.server_content and response.server_content.model_turn:
-                        logger.debug(f"model_turn parts: {len(response.server_content.model_turn.parts)}")
-                        for part in response.server_content.model_turn.parts:
-                            logger.debug(f"Part type: {type(part)}, has inline_data: {hasattr(part, 'inline_data')}")
-                            if hasattr(part, 'inline_data') and part.inline_data:
-                                logger.debug(f"inline_data type: {type(part.inline_data.data)}, len: {len(part.inline_data.data) if part.inline_data.data else 0}")
-                            if part.inline_data and isinstance(part.inline_data.data, bytes):
-                                logger.info(f"Yielding audio chunk: {len(part.inline_data.data)} bytes")
-                                yield part.inline_data.data
-
-                logger.debug("Turn completed, waiting for next turn...")
+                    model_turn = sc.model_turn
+                    if model_turn:
+                        for part in model_turn.parts:
+                            inline_data = part.inline_data
+                            if inline_data is None:
+                                continue
+                            data = inline_data.data
+                            if not isinstance(data, bytes):
+                                continue
+                            if debug:
+                                logger.debug("Received audio chunk: %d bytes", len(data))
+                            if not pending and len(data) % frame_bytes == 0:
+                                # Already frame-aligned: pass through without copying
+                                yield memoryview(data)
+                                continue
+                            pending += data
+                            whole = len(pending) - len(pending) % frame_bytes
+                            if whole:
+                                frame = pending[:whole]
+                                del pending[:whole]
+                                yield memoryview(frame)
+
+                    if pending and sc.turn_complete:
+                        frame, pending = pending, bytearray()
+                        yield memoryview(frame)
+
+                if pending:
+                    # Turn ended without turn_complete - don't hold audio back
+                    frame, pending = pending, bytearray()
+                    yield memoryview(frame)
+
+                if debug:
+                    logger.debug("Turn completed, waiting for next turn...")
 
         except Exception as e:
             logger.error(f"Error receiving audio: {e}")
@@ -193,8 +311,9 @@ class GeminiLiveClient:
         Called when user starts speaking while AI is responding.
 
         Note: With automatic activity detection enabled (default),
-        Gemini handles barge-in automatically. We just clear the
-        local audio queue - no need to send explicit ActivityStart.
+        Gemini handles barge-in automatically and reports it via
+        server_content.interrupted, which receive_audio forwards to the
+        on_interrupted callback - no need to send explicit ActivityStart.
         """
         if self.session is None:
             logger.warning("Cannot interrupt: session not connected")
@@ -204,14 +323,14 @@ class GeminiLiveClient:
         # automatically when it detects user speech. We just log it.
         logger.info("Barge-in detected - Gemini will handle automatically")
 
-    def on_audio(self, callback: Callable[[bytes], None]) -> None:
-        """Register callback for audio output."""
-        self._on_audio_callback = callback
-
     def on_tool_call(self, callback: Callable[[str, str, dict], None]) -> None:
         """Register callback for function/tool calls. Callback receives (name, id, args)."""
         self._on_tool_call_callback = callback
 
+    def on_interrupted(self, callback: Callable[[], None]) -> None:
+        """Register callback for when Gemini reports the caller interrupted it."""
+        self._on_interrupted_callback = callback
+
     async def send_tool_response(self, function_call_id: str, tool_name: str, result: dict) -> None:
         """
         Send the result of a tool call back to Gemini.
@@ -228,8 +347,6 @@ class GeminiLiveClient:
 
         logger.info(f"Sending tool response for {tool_name} ({function_call_id}): {result}")
 
-        from google.genai import types
-
         await self.session.send_tool_response(
             function_responses=[
                 types.FunctionResponse(
@@ -242,6 +359,13 @@ class GeminiLiveClient:
 
     async def close(self) -> None:
         """Close the Live API session."""
+        # Send buffered caller audio now instead of dropping it with the timer
+        self._cancel_send_flush()
+        try:
+            await self._flush_send_buf()
+        except Exception as e:
+            logger.error(f"Error flushing buffered audio to Gemini: {e}")
+        self._send_buf.clear()
         if self._session_context is not None:
             try:
                 await self._session_context.__aexit__(None, None, None)
@@ -2,6 +2,9 @@
 System prompts for the voice agent.
 """
 
+import functools
+import string
+
 SYSTEM_PROMPT = """You are Sam, an AI assistant making restaurant reservation calls on behalf of users.
 
 CRITICAL REQUIREMENTS:
@@ -60,6 +63,42 @@ If the preferred time is unavailable, negotiate within the time range {time_rang
 """
 
 
+def _compile_template(template: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    Split a {name}-style template into literal parts and field names, once.
+
+    _render only substitutes str(value), so format specs, conversions and
+    attribute/index lookups are rejected here rather than silently dropped.
+    """
+    literals, fields = [], []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        literals.append(literal)
+        if field is None:
+            continue
+        if spec or conversion or not field.isidentifier():
+            raise ValueError(
+                f"Unsupported template field {{{field}}}: only plain {{name}} fields are allowed"
+            )
+        fields.append(field)
+    return tuple(literals), tuple(fields)
+
+
+def _render(compiled: tuple[tuple[str, ...], tuple[str, ...]], values: dict) -> str:
+    """Fill a compiled template by joining literals and values in order."""
+    literals, fields = compiled
+    parts = []
+    for literal, field in zip(literals, fields):
+        parts.append(literal)
+        parts.append(str(values[field]))
+    parts.extend(literals[len(fields):])
+    return "".join(parts)
+
+
+_SYSTEM_TEMPLATE = _compile_template(SYSTEM_PROMPT)
+_OUTBOUND_TEMPLATE = _compile_template(OUTBOUND_SYSTEM_PROMPT)
+
+
+@functools.lru_cache(maxsize=256)
 def build_reservation_prompt(
     user_name: str,
     party_size: int,
@@ -68,13 +107,13 @@ def build_reservation_prompt(
     contact_phone: str,
 ) -> str:
     """Build the system prompt with reservation details."""
-    return SYSTEM_PROMPT.format(
-        user_name=user_name,
-        party_size=party_size,
-        preferred_date=preferred_date,
-        preferred_time=preferred_time,
-        contact_phone=contact_phone,
-    )
+    return _render(_SYSTEM_TEMPLATE, {
+        "user_name": user_name,
+        "party_size": party_size,
+        "preferred_date": preferred_date,
+        "preferred_time": preferred_time,
+        "contact_phone": contact_phone,
+    })
 
 
 def build_outbound_prompt(
@@ -89,14 +128,41 @@ def build_outbound_prompt(
     special_requests: str = "",
 ) -> str:
     """Build the system prompt for outbound reservation calls."""
-    return OUTBOUND_SYSTEM_PROMPT.format(
-        user_name=user_name,
-        restaurant_name=restaurant_name,
-        party_size=party_size,
-        preferred_date=preferred_date,
-        preferred_time=preferred_time,
-        time_range_start=time_range_start,
-        time_range_end=time_range_end,
-        contact_phone=contact_phone,
-        special_requests=special_requests or "None",
+    # Normalize before the cached call so "" and None share one entry
+    return _format_outbound_prompt(
+        user_name,
+        restaurant_name,
+        party_size,
+        preferred_date,
+        preferred_time,
+        time_range_start,
+        time_range_end,
+        contact_phone,
+        special_requests or "None",
     )
+
+
+@functools.lru_cache(maxsize=256)
+def _format_outbound_prompt(
+    user_name: str,
+    restaurant_name: str,
+    party_size: int,
+    preferred_date: str,
+    preferred_time: str,
+    time_range_start: str,
+    time_range_end: str,
+    contact_phone: str,
+    special_requests: str,
+) -> str:
+    """Format the outbound template, memoized on the call values."""
+    return _render(_OUTBOUND_TEMPLATE, {
+        "user_name": user_name,
+        "restaurant_name": restaurant_name,
+        "party_size": party_size,
+        "preferred_date": preferred_date,
+        "preferred_time": preferred_time,
+        "time_range_start": time_range_start,
+        "time_range_end": time_range_end,
+        "contact_phone": contact_phone,
+        "special_requests": special_requests,
+    })
@@ -0,0 +1,37 @@
+"""
+Voice Engine Settings
+Environment configuration, read once at import instead of per request.
+"""
+
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Environment-derived configuration for the voice engine."""
+
+    gemini_api_key: str | None
+    twilio_account_sid: str | None
+    twilio_auth_token: str | None
+    twilio_phone_number: str | None
+    database_url: str | None
+    redis_url: str
+    public_scheme: str
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from the current environment."""
+        return cls(
+            gemini_api_key=os.getenv("GEMINI_API_KEY"),
+            twilio_account_sid=os.getenv("TWILIO_ACCOUNT_SID"),
+            twilio_auth_token=os.getenv("TWILIO_AUTH_TOKEN"),
+            twilio_phone_number=os.getenv("TWILIO_PHONE_NUMBER"),
+            database_url=os.getenv("DATABASE_URL"),
+            redis_url=os.getenv("REDIS_URL", "redis://localhost:6379"),
+            public_scheme=os.getenv("PUBLIC_SCHEME", "http"),
+        )
+
+
+# Module-level settings (main.py loads .env before importing src)
+settings = Settings.from_env()
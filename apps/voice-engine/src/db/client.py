@@ -4,14 +4,17 @@ Provides a Supabase-like interface for direct Postgres connections.
 Used for local development with sam-postgres container.
 """
 
-import os
+import asyncio
 import logging
+from contextlib import ExitStack
 from typing import Any
 from urllib.parse import urlparse
 
-import psycopg2
-import psycopg2.extensions
-from psycopg2.extras import RealDictCursor
+from psycopg import sql
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
+
+from ..config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +38,19 @@ class TableQuery:
         self._select_columns: str = "*"
 
     def select(self, columns: str = "*") -> "TableQuery":
-        """Select columns from the table."""
+        """
+        Select columns from the table.
+
+        Accepts "*" or a comma-separated list of bare column names. Each name
+        is quoted as an identifier, so PostgREST-style embeds (table(col)),
+        aliases (a:b), casts and expressions like count(*) are rejected.
+        """
+        if columns.strip() != "*":
+            for col in columns.split(","):
+                if not col.strip().isidentifier():
+                    raise ValueError(
+                        f"Unsupported select column {col.strip()!r}: only bare column names or '*'"
+                    )
         self._operation = "select"
         self._select_columns = columns
         return self
@@ -58,76 +73,98 @@ class TableQuery:
         return self
 
     def execute(self) -> QueryResult:
-        """Execute the query."""
-        conn = self._client._get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                if self._operation == "select":
-                    return self._execute_select(cur)
-                elif self._operation == "insert":
-                    return self._execute_insert(cur)
-                elif self._operation == "update":
-                    return self._execute_update(cur)
-                else:
-                    raise ValueError(f"Unknown operation: {self._operation}")
-        finally:
-            conn.commit()
-
-    def _execute_select(self, cur) -> QueryResult:
-        """Execute SELECT and return matching rows."""
-        where_clause = ""
-        values = []
-
-        if self._filters:
-            conditions = [f"{col} {op} %s" for col, op, _ in self._filters]
-            where_clause = "WHERE " + " AND ".join(conditions)
-            values = [val for _, _, val in self._filters]
-
-        query = f"""
-            SELECT {self._select_columns}
-            FROM {self._table}
-            {where_clause}
+        """Execute the query on a pooled connection."""
+        # The pool commits on success and rolls back on error
+        with self._client._pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(*self._compose())
+            return self._result(cur)
+
+    async def execute_async(self) -> QueryResult:
+        """Execute the query in a worker thread so the event loop keeps running."""
+        return await asyncio.to_thread(self.execute)
+
+    def _columns_sql(self) -> sql.Composable:
+        """Compose the select list ("*" or bare column names, see select())."""
+        if self._select_columns.strip() == "*":
+            return sql.SQL("*")
+        return sql.SQL(", ").join(
+            sql.Identifier(col.strip()) for col in self._select_columns.split(",")
+        )
+
+    def _where_sql(self) -> tuple[sql.Composable, list]:
         """
-        cur.execute(query, values)
-        rows = cur.fetchall()
-        return QueryResult([dict(row) for row in rows] if rows else [])
-
-    def _execute_insert(self, cur) -> QueryResult:
-        """Execute INSERT and return the inserted row."""
-        columns = list(self._data.keys())
-        values = list(self._data.values())
-        placeholders = ", ".join(["%s"] * len(values))
-        col_names = ", ".join(columns)
-
-        query = f"""
-            INSERT INTO {self._table} ({col_names})
-            VALUES ({placeholders})
-            RETURNING *
-        """
-        cur.execute(query, values)
-        row = cur.fetchone()
-        return QueryResult([dict(row)] if row else [])
-
-    def _execute_update(self, cur) -> QueryResult:
-        """Execute UPDATE and return the updated row."""
-        set_clause = ", ".join([f"{k} = %s" for k in self._data.keys()])
-        values = list(self._data.values())
-
-        where_clause = ""
-        if self._filters:
-            conditions = [f"{col} {op} %s" for col, op, _ in self._filters]
-            where_clause = "WHERE " + " AND ".join(conditions)
-            values.extend([val for _, _, val in self._filters])
-
-        query = f"""
-            UPDATE {self._table}
-            SET {set_clause}
-            {where_clause}
-            RETURNING *
+        Compose the WHERE clause and its parameter values.
+
+        Filters are only ever AND-ed, so their order doesn't matter; sorting
+        by column makes the statement text independent of .eq() call order,
+        so the same query shape reuses one prepared statement.
         """
-        cur.execute(query, values)
+        if not self._filters:
+            return sql.SQL(""), []
+        filters = sorted(self._filters, key=lambda f: f[0])
+        conditions = sql.SQL(" AND ").join(
+            sql.SQL("{} {} %s").format(sql.Identifier(col), sql.SQL(op))
+            for col, op, _ in filters
+        )
+        return sql.SQL("WHERE {}").format(conditions), [val for _, _, val in filters]
+
+    def _compose(self) -> tuple[sql.Composable, list]:
+        """Compose the statement and its parameter values."""
+        if self._operation == "select":
+            return self._compose_select()
+        elif self._operation == "insert":
+            return self._compose_insert()
+        elif self._operation == "update":
+            return self._compose_update()
+        else:
+            raise ValueError(f"Unknown operation: {self._operation}")
+
+    def _result(self, cur) -> QueryResult:
+        """Fetch the executed statement's rows from the cursor."""
+        if self._operation == "select":
+            return QueryResult(cur.fetchall())
+        # INSERT/UPDATE ... RETURNING: a single row
         row = cur.fetchone()
-        return QueryResult([dict(row)] if row else [])
+        return QueryResult([row] if row else [])
+
+    def _compose_select(self) -> tuple[sql.Composable, list]:
+        """Compose SELECT for matching rows."""
+        where_clause, values = self._where_sql()
+        query = sql.SQL("SELECT {} FROM {} {}").format(
+            self._columns_sql(), sql.Identifier(self._table), where_clause
+        )
+        return query, values
+
+    def _compose_insert(self) -> tuple[sql.Composable, list]:
+        """Compose INSERT returning the inserted row."""
+        # One pass over the row for both column names and values
+        columns, values = [], []
+        for col, val in self._data.items():
+            columns.append(sql.Identifier(col))
+            values.append(val)
+        query = sql.SQL("INSERT INTO {} ({}) VALUES ({}) RETURNING *").format(
+            sql.Identifier(self._table),
+            sql.SQL(", ").join(columns),
+            sql.SQL(", ").join(sql.Placeholder() * len(values)),
+        )
+        return query, values
+
+    def _compose_update(self) -> tuple[sql.Composable, list]:
+        """Compose UPDATE returning the updated row."""
+        # One pass over the row for both the SET list and its values
+        assignments, values = [], []
+        for col, val in self._data.items():
+            assignments.append(sql.SQL("{} = %s").format(sql.Identifier(col)))
+            values.append(val)
+        set_clause = sql.SQL(", ").join(assignments)
+
+        where_clause, where_values = self._where_sql()
+        values.extend(where_values)
+
+        query = sql.SQL("UPDATE {} SET {} {} RETURNING *").format(
+            sql.Identifier(self._table), set_clause, where_clause
+        )
+        return query, values
 
 
 class PostgresClient:
@@ -140,9 +177,18 @@ class PostgresClient:
         print(result.data[0]["id"])
     """
 
-    def __init__(self, database_url: str):
+    def __init__(self, database_url: str, min_connections: int = 1, max_connections: int = 8):
         self._database_url = database_url
-        self._conn: psycopg2.extensions.connection | None = None
+        # Thread-safe pool: queries run concurrently from worker threads.
+        # prepare_threshold=0 prepares every statement server-side on first
+        # use, so repeated tool-call writes skip parse/plan.
+        self._pool = ConnectionPool(
+            database_url,
+            min_size=min_connections,
+            max_size=max_connections,
+            kwargs={"row_factory": dict_row, "prepare_threshold": 0},
+            open=True,
+        )
         logger.info(f"PostgresClient initialized for {self._mask_url(database_url)}")
 
     def _mask_url(self, url: str) -> str:
@@ -152,38 +198,74 @@ class PostgresClient:
             return url.replace(parsed.password, "***")
         return url
 
-    def _get_connection(self) -> psycopg2.extensions.connection:
-        """Get or create database connection."""
-        if self._conn is None or self._conn.closed:
-            self._conn = psycopg2.connect(self._database_url)
-        return self._conn
-
     def table(self, name: str) -> TableQuery:
         """Start a query on a table."""
         return TableQuery(self, name)
 
+    def execute_all(self, queries: list[TableQuery]) -> list[QueryResult]:
+        """
+        Execute several queries in one transaction.
+
+        The statements are pipelined on a single connection, so they reach
+        the server in one round trip and either all commit or none do.
+
+        Args:
+            queries: Built (not yet executed) table queries, run in order
+
+        Returns:
+            One QueryResult per query, in the same order
+        """
+        statements = [query._compose() for query in queries]
+        # The ExitStack closes every cursor, as TableQuery.execute's with-block does
+        with self._pool.connection() as conn, conn.pipeline(), ExitStack() as cursor_stack:
+            cursors = []
+            for statement in statements:
+                cur = cursor_stack.enter_context(conn.cursor())
+                cur.execute(*statement)
+                cursors.append(cur)
+            return [query._result(cur) for query, cur in zip(queries, cursors)]
+
+    async def execute_all_async(self, queries: list[TableQuery]) -> list[QueryResult]:
+        """Execute queries in one transaction from a worker thread."""
+        return await asyncio.to_thread(self.execute_all, queries)
+
     def close(self) -> None:
-        """Close the database connection."""
-        if self._conn and not self._conn.closed:
-            self._conn.close()
-            logger.info("PostgresClient connection closed")
+        """Close all pooled database connections."""
+        if not self._pool.closed:
+            self._pool.close()
+            logger.info("PostgresClient connections closed")
+
+
+# Process-wide client, so every caller shares one connection pool
+_shared_client: PostgresClient | None = None
 
 
 def get_db_client() -> PostgresClient | None:
     """
-    Get database client from environment.
+    Get the shared database client from environment.
 
     Checks for DATABASE_URL first (direct Postgres),
-    falls back to SUPABASE_URL if available.
+    falls back to SUPABASE_URL if available. The client is created on
+    first use and reused afterwards; failed connections aren't cached,
+    so a later call retries.
     """
-    database_url = os.getenv("DATABASE_URL")
+    global _shared_client
+    if _shared_client is not None and not _shared_client._pool.closed:
+        return _shared_client
+
+    database_url = settings.database_url
 
     if database_url:
         try:
             client = PostgresClient(database_url)
             # Test connection
-            client._get_connection()
+            try:
+                client._pool.wait(timeout=10.0)
+            except Exception:
+                client.close()
+                raise
             logger.info("Connected to Postgres via DATABASE_URL")
+            _shared_client = client
             return client
         except Exception as e:
             logger.error(f"Failed to connect to Postgres: {e}")
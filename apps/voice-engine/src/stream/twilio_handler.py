@@ -4,10 +4,11 @@ Manages WebSocket connection with Twilio for real-time audio.
 """
 
 import asyncio
-import json
-import base64
+import binascii
 import logging
+from collections import deque
 from typing import Literal
+import orjson
 from fastapi import WebSocket
 from pydantic import BaseModel, ValidationError
 
@@ -18,13 +19,46 @@ from pathlib import Path
 libs_path = Path(__file__).parent.parent.parent.parent.parent / "libs"
 sys.path.insert(0, str(libs_path))
 
-from audio_utils import transcode_mulaw_to_pcm, transcode_pcm_24k_to_mulaw
+from audio_utils import pcm_peak, transcode_mulaw_to_pcm, transcode_pcm_24k_to_mulaw_stream
 from src.brain.gemini_client import GeminiLiveClient
 from src.tools import save_booking, report_no_availability, end_call, CallContext
 from src.db import get_db_client, PostgresClient
 
 logger = logging.getLogger(__name__)
 
+# Cap on μ-law audio queued for Twilio, in bytes: 1s at 8kHz (50 20ms
+# frames). Gemini chunks vary in size, so the cap counts bytes, not chunks.
+# When the websocket falls behind, the oldest chunks are dropped to stay
+# real-time; the newest chunk is always kept.
+OUTBOUND_QUEUE_MAX_BYTES = 8000
+MULAW_BYTES_PER_MS = 8
+
+# Most queued audio chunks merged into one Twilio media message (one JSON
+# encode and one websocket write instead of one per chunk)
+OUTBOUND_BATCH_MAX_CHUNKS = 10
+
+# Inbound frames quieter than this peak (16-bit PCM) count as silence. Silence
+# is still forwarded for SILENCE_HANGOVER_FRAMES (2s of 20ms frames) after the
+# caller last spoke so Gemini's VAD sees the end of speech; after that it is
+# dropped until the caller speaks again. The last SILENCE_PREROLL_FRAMES gated
+# frames (80ms) are sent ahead of the frame that reopens the gate so the onset
+# of speech isn't clipped.
+SILENCE_PEAK_THRESHOLD = 200
+SILENCE_HANGOVER_FRAMES = 100
+SILENCE_PREROLL_FRAMES = 4
+
+# How long stream teardown waits for already-received tool calls to finish
+# before cancelling them, so a hung DB write can't hold the handler open
+TOOL_DRAIN_TIMEOUT_SECONDS = 10.0
+
+# Gemini tool name -> TwilioMediaHandler method that executes it. Looked up by
+# name at call time so a single dict lookup both validates and dispatches.
+TOOL_EXECUTORS = {
+    "save_booking": "_execute_save_booking",
+    "report_no_availability": "_execute_report_no_availability",
+    "end_call": "_execute_end_call",
+}
+
 
 # Pydantic models for Twilio WebSocket message validation
 class TwilioStartData(BaseModel):
@@ -101,14 +135,30 @@ class TwilioMediaHandler:
             system_prompt: Optional custom system prompt for Gemini
         """
         self.websocket = websocket
+        self._media_prefix: str | None = None  # Cached message envelopes, see stream_sid
+        self._clear_message: str | None = None
         self.stream_sid: str | None = None
         self.call_sid: str | None = None
         self.call_id: str | None = None  # Database record ID
         self._db = db or get_database_client()
-        self._outbound_queue: asyncio.Queue[bytes] = asyncio.Queue()
+        # Single producer/consumer: a plain deque plus a wakeup event avoids
+        # asyncio.Queue's per-get/put future bookkeeping
+        self._outbound_audio: deque[bytes] = deque()
+        self._outbound_bytes = 0  # Total size of _outbound_audio
+        self._outbound_ready = asyncio.Event()
+        self._dropped_bytes = 0  # Stale μ-law audio dropped under backpressure
+        self._silent_frames = 0  # Consecutive silent inbound frames
+        self._preroll: deque[bytes] = deque(maxlen=SILENCE_PREROLL_FRAMES)
+        self._resample_state = None  # 24k samples carried across Gemini chunks
+        # Checked once per call so per-frame debug logs cost nothing when disabled
+        self._debug = logger.isEnabledFor(logging.DEBUG)
         self._is_speaking = False
         self._running = False
         self._tasks: list[asyncio.Task] = []
+        self._clear_tasks: set[asyncio.Task] = set()  # In-flight Twilio clears
+        # Tool calls run one at a time, in the order Gemini made them, on a
+        # single worker task (None stops it)
+        self._tool_queue: asyncio.Queue[tuple[str, str, dict] | None] = asyncio.Queue()
         self._booking_saved = False  # Track if booking was saved
         self._gemini: GeminiLiveClient | None = None  # Reference for tool responses
         self._call_context = call_context or {}
@@ -119,6 +169,24 @@ class TwilioMediaHandler:
         self._restaurant_id = self._call_context.get("restaurant_id")
         self._restaurant_name = self._call_context.get("restaurant_name")
         self._user_id = self._call_context.get("user_id")
+        self._tool_context: CallContext | None = None  # Built once call_id is known
+
+    @property
+    def stream_sid(self) -> str | None:
+        """Twilio stream SID; setting it rebuilds the cached message envelopes."""
+        return self._stream_sid
+
+    @stream_sid.setter
+    def stream_sid(self, sid: str | None) -> None:
+        self._stream_sid = sid
+        if sid:
+            # Only the payload varies per media message, so the JSON around
+            # it is built once per stream instead of encoded per frame
+            quoted_sid = orjson.dumps(sid).decode()
+            self._media_prefix = f'{{"event":"media","streamSid":{quoted_sid},"media":{{"payload":"'
+            self._clear_message = f'{{"event":"clear","streamSid":{quoted_sid}}}'
+        else:
+            self._media_prefix = self._clear_message = None
 
     async def handle_stream(self, gemini: GeminiLiveClient) -> None:
         """
@@ -131,48 +199,88 @@ class TwilioMediaHandler:
 
         # Register tool callback to handle save_booking calls from Gemini
         gemini.on_tool_call(self._handle_tool_call)
+        # Drop queued audio as soon as Gemini reports a barge-in
+        gemini.on_interrupted(self._handle_interrupted)
 
         # Start background tasks
         self._tasks = [
             asyncio.create_task(self._gemini_receive_loop(gemini)),
             asyncio.create_task(self._outbound_audio_loop()),
         ]
+        tool_worker = asyncio.create_task(self._tool_worker())
 
         try:
             async for message in self.websocket.iter_text():
                 await self._process_message(message, gemini)
         finally:
-            self._running = False
+            self._stop()
             # Cancel background tasks
             for task in self._tasks:
                 task.cancel()
             # Wait for tasks to complete
-            await asyncio.gather(*self._tasks, return_exceptions=True)
+            await asyncio.gather(*self._tasks, *self._clear_tasks, return_exceptions=True)
+            # Let tool calls already received finish their DB writes
+            self._tool_queue.put_nowait(None)
+            try:
+                # wait_for cancels the worker if the deadline passes
+                await asyncio.wait_for(tool_worker, timeout=TOOL_DRAIN_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Tool calls still running after {TOOL_DRAIN_TIMEOUT_SECONDS}s; cancelled"
+                )
+            except Exception as e:
+                logger.error(f"Error in tool worker: {e}")
             await gemini.close()
+            if self._dropped_bytes:
+                logger.info(
+                    f"Dropped {self._dropped_bytes // MULAW_BYTES_PER_MS}ms of outbound audio during call"
+                )
 
     async def _process_message(self, message: str, gemini: GeminiLiveClient) -> None:
         """Process a single Twilio WebSocket message with validation."""
         try:
-            data = json.loads(message)
-        except json.JSONDecodeError as e:
+            data = orjson.loads(message)
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid JSON in WebSocket message: {e}")
             return
 
-        # Extract event type first
-        try:
-            base_msg = TwilioBaseMessage.model_validate(data)
-            event = base_msg.event
-        except ValidationError as e:
-            logger.error(f"Invalid message format (missing event): {e}")
+        # Dispatch on the event field directly - media frames arrive ~50/s,
+        # so only the rare start event goes through Pydantic validation
+        event = data.get("event") if isinstance(data, dict) else None
+        if not isinstance(event, str):
+            logger.error("Invalid message format (missing event)")
             return
 
-        if event == "connected":
-            # Connection established
+        if event == "media":
+            # Incoming audio from caller (checked first: ~50 frames/s)
             try:
-                TwilioConnectedMessage.model_validate(data)
-                logger.info("Twilio WebSocket connected")
-            except ValidationError as e:
-                logger.warning(f"Connected event validation warning: {e}")
+                payload = data["media"]["payload"]
+            except (KeyError, TypeError) as e:
+                logger.error(f"Invalid media message: {e!r}")
+                return
+            if not isinstance(payload, str):
+                logger.error("Invalid media message: payload is not a string")
+                return
+            try:
+                mulaw_audio = binascii.a2b_base64(payload)
+            except Exception as e:
+                logger.error(f"Error decoding audio payload: {e}")
+                return
+
+            # Note: Barge-in is detected by Gemini's voice activity
+            # detection and surfaces via _handle_interrupted.
+
+            # Transcode and send to Gemini
+            pcm_audio = self._gate_inbound(transcode_mulaw_to_pcm(mulaw_audio))
+            if not pcm_audio:
+                return
+            if self._debug:
+                logger.debug("Sending %d bytes to Gemini (from %d mulaw)", len(pcm_audio), len(mulaw_audio))
+            await gemini.send_audio(pcm_audio)
+
+        elif event == "connected":
+            # Connection established
+            logger.info("Twilio WebSocket connected")
 
         elif event == "start":
             # Stream started - capture metadata
@@ -191,35 +299,10 @@ class TwilioMediaHandler:
                 logger.error(f"Invalid start message: {e}")
                 return
 
-        elif event == "media":
-            # Incoming audio from caller
-            try:
-                msg = TwilioMediaMessage.model_validate(data)
-                mulaw_audio = base64.b64decode(msg.media.payload)
-            except ValidationError as e:
-                logger.error(f"Invalid media message: {e}")
-                return
-            except Exception as e:
-                logger.error(f"Error decoding audio payload: {e}")
-                return
-
-            # Note: Barge-in is handled automatically by Gemini's
-            # voice activity detection. We just forward all audio.
-
-            # Transcode and send to Gemini
-            pcm_audio = transcode_mulaw_to_pcm(mulaw_audio)
-            logger.debug(f"Sending {len(pcm_audio)} bytes to Gemini (from {len(mulaw_audio)} mulaw)")
-            await gemini.send_audio(pcm_audio)
-
         elif event == "stop":
             # Stream ended - update call status
-            try:
-                TwilioStopMessage.model_validate(data)
-                logger.info("Stream stopped")
-                await self._update_call_status()
-            except ValidationError as e:
-                logger.warning(f"Stop event validation warning: {e}")
-                await self._update_call_status()
+            logger.info("Stream stopped")
+            await self._update_call_status()
 
         else:
             logger.debug(f"Ignoring unknown event type: {event}")
@@ -246,17 +329,26 @@ class TwilioMediaHandler:
             if self._restaurant_id:
                 call_data["restaurant_id"] = self._restaurant_id
 
-            result = self._db.table("calls").insert(call_data).execute()
+            writes = [self._db.table("calls").insert(call_data).execute_async()]
+            # If part of a request, update request status to in_progress. It
+            # doesn't depend on the new call id, so both writes go out together.
+            if self._request_id:
+                writes.append(
+                    self._db.table("reservation_requests").update(
+                        {"status": "in_progress"}
+                    ).eq("id", self._request_id).execute_async()
+                )
+            result, *request_update = await asyncio.gather(*writes, return_exceptions=True)
+
+            for outcome in request_update:
+                if isinstance(outcome, Exception):
+                    logger.error(f"Error updating request status: {outcome}")
+            if isinstance(result, Exception):
+                raise result
 
             if result.data:
                 self.call_id = result.data[0]["id"]
                 logger.info(f"Created call record: {self.call_id} for twilio_sid: {self.call_sid}")
-
-                # If part of a request, update request status to in_progress
-                if self._request_id:
-                    self._db.table("reservation_requests").update(
-                        {"status": "in_progress"}
-                    ).eq("id", self._request_id).execute()
             else:
                 logger.error("Failed to create call record - no data returned")
 
@@ -264,14 +356,17 @@ class TwilioMediaHandler:
             logger.error(f"Error creating call record: {e}")
 
     def _get_call_context(self) -> CallContext:
-        """Build the call context for tool execution."""
-        return CallContext(
-            call_id=self.call_id,
-            request_id=self._request_id,
-            restaurant_id=self._restaurant_id,
-            restaurant_name=self._restaurant_name,
-            user_id=self._user_id,
-        )
+        """Get the call context for tool execution, built once per call_id."""
+        context = self._tool_context
+        if context is None or context["call_id"] != self.call_id:
+            context = self._tool_context = CallContext(
+                call_id=self.call_id,
+                request_id=self._request_id,
+                restaurant_id=self._restaurant_id,
+                restaurant_name=self._restaurant_name,
+                user_id=self._user_id,
+            )
+        return context
 
     def _handle_tool_call(self, tool_name: str, tool_id: str, tool_args: dict) -> None:
         """
@@ -280,14 +375,24 @@ class TwilioMediaHandler:
         """
         logger.info(f"Tool call received: {tool_name} (id={tool_id}) with args: {tool_args}")
 
-        if tool_name == "save_booking":
-            asyncio.create_task(self._execute_save_booking(tool_id, tool_args))
-        elif tool_name == "report_no_availability":
-            asyncio.create_task(self._execute_report_no_availability(tool_id, tool_args))
-        elif tool_name == "end_call":
-            asyncio.create_task(self._execute_end_call(tool_id, tool_args))
-        else:
+        if tool_name not in TOOL_EXECUTORS:
             logger.warning(f"Unknown tool call: {tool_name}")
+            return
+
+        # Handed to the tool worker so the audio receive loop never waits on it
+        self._tool_queue.put_nowait((tool_name, tool_id, tool_args))
+
+    async def _tool_worker(self) -> None:
+        """Background task that executes queued tool calls in order."""
+        while (item := await self._tool_queue.get()) is not None:
+            tool_name, tool_id, tool_args = item
+            execute = getattr(self, TOOL_EXECUTORS[tool_name])
+            try:
+                await execute(tool_id, tool_args)
+            except Exception as e:
+                # Keep the worker alive for the calls queued behind this one;
+                # CancelledError still propagates for the teardown timeout
+                logger.error(f"Error executing tool {tool_name} (id={tool_id}): {e}")
 
     async def _execute_save_booking(self, tool_id: str, booking_args: dict) -> None:
         """Execute save_booking asynchronously and send response to Gemini."""
@@ -384,27 +489,84 @@ class TwilioMediaHandler:
         final_status = "completed" if self._booking_saved else "failed"
 
         try:
-            self._db.table("calls").update({
+            await self._db.table("calls").update({
                 "status": final_status,
-            }).eq("id", self.call_id).execute()
+            }).eq("id", self.call_id).execute_async()
             logger.info(f"Updated call {self.call_id} status to: {final_status}")
         except Exception as e:
             logger.error(f"Error updating call status: {e}")
 
-    async def _handle_barge_in(self, gemini: GeminiLiveClient) -> None:
-        """Handle user interruption (barge-in)."""
-        # Clear the outbound queue
-        while not self._outbound_queue.empty():
-            try:
-                self._outbound_queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
-
+    def _gate_inbound(self, pcm_audio: bytes) -> bytes:
+        """
+        Return the inbound audio to forward to Gemini, or b"" if it is gated.
+        Speech that reopens the gate is prefixed with the buffered preroll.
+        """
+        if pcm_peak(pcm_audio) >= SILENCE_PEAK_THRESHOLD:
+            self._silent_frames = 0
+            if self._preroll:
+                pcm_audio = b"".join((*self._preroll, pcm_audio))
+                self._preroll.clear()
+            return pcm_audio
+        self._silent_frames += 1
+        if self._silent_frames <= SILENCE_HANGOVER_FRAMES:
+            return pcm_audio
+        self._preroll.append(pcm_audio)
+        return b""
+
+    def _queue_outbound_audio(self, audio: bytes) -> None:
+        """Queue audio for Twilio, dropping the oldest chunks if over the byte cap."""
+        pending = self._outbound_audio
+        pending.append(audio)
+        self._outbound_bytes += len(audio)
+        if self._outbound_bytes > OUTBOUND_QUEUE_MAX_BYTES and len(pending) > 1:
+            before = self._dropped_bytes
+            while self._outbound_bytes > OUTBOUND_QUEUE_MAX_BYTES and len(pending) > 1:
+                stale = len(pending.popleft())
+                self._outbound_bytes -= stale
+                self._dropped_bytes += stale
+            # Warn on the first drop, then once per further second dropped
+            seconds_before = before // OUTBOUND_QUEUE_MAX_BYTES
+            if not before or seconds_before != self._dropped_bytes // OUTBOUND_QUEUE_MAX_BYTES:
+                logger.warning(
+                    f"Outbound audio backlog: dropped {self._dropped_bytes // MULAW_BYTES_PER_MS}ms of stale audio"
+                )
+        self._outbound_ready.set()
+
+    def _take_outbound_batch(self) -> bytes:
+        """Pop queued audio (up to a cap) and merge it into one payload."""
+        pending = self._outbound_audio
+        if len(pending) == 1:
+            audio = pending.popleft()
+        else:
+            count = min(len(pending), OUTBOUND_BATCH_MAX_CHUNKS)
+            audio = b"".join([pending.popleft() for _ in range(count)])
+        self._outbound_bytes -= len(audio)
+        return audio
+
+    def _flush_outbound_audio(self) -> None:
+        """Drop all audio queued for Twilio."""
+        self._outbound_audio.clear()
+        self._outbound_bytes = 0
+        self._resample_state = None
         self._is_speaking = False
-        await gemini.interrupt()
-        # Send clear message to Twilio to stop playback
-        await self._send_clear()
-        logger.info("Barge-in handled: cleared queue and interrupted Gemini")
+
+    def _handle_interrupted(self) -> None:
+        """
+        Handle Gemini's interrupted signal.
+        Called from the receive loop, so the Twilio clear is sent as a task.
+        """
+        self._flush_outbound_audio()
+        # Keep a reference until done so the task can't be garbage-collected
+        task = asyncio.create_task(self._send_clear())
+        self._clear_tasks.add(task)
+        task.add_done_callback(self._clear_task_done)
+        logger.info("Barge-in: dropped queued audio and cleared Twilio playback")
+
+    def _clear_task_done(self, task: asyncio.Task) -> None:
+        """Forget a finished clear task and log its failure, if any."""
+        self._clear_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error sending clear to Twilio: {task.exception()}")
 
     async def _gemini_receive_loop(self, gemini: GeminiLiveClient) -> None:
         """Background task to receive audio from Gemini and queue for Twilio."""
@@ -414,11 +576,17 @@ class TwilioMediaHandler:
                 if not self._running:
                     break
 
-                # Transcode 24kHz PCM to 8kHz μ-law for Twilio
-                mulaw_audio = transcode_pcm_24k_to_mulaw(pcm_audio)
+                # Transcode 24kHz PCM to 8kHz μ-law for Twilio (reads the
+                # memoryview in place - no intermediate bytes copy). Filter
+                # state carries across chunks so boundaries don't click.
+                mulaw_audio, self._resample_state = transcode_pcm_24k_to_mulaw_stream(
+                    pcm_audio, self._resample_state
+                )
+                if not mulaw_audio:
+                    continue
 
                 # Queue for sending to Twilio
-                await self._outbound_queue.put(mulaw_audio)
+                self._queue_outbound_audio(mulaw_audio)
                 self._is_speaking = True
 
         except asyncio.CancelledError:
@@ -426,28 +594,26 @@ class TwilioMediaHandler:
         except Exception as e:
             logger.error(f"Error in Gemini receive loop: {e}")
 
+    def _stop(self) -> None:
+        """Mark the stream stopped and wake the outbound loop so it can exit."""
+        self._running = False
+        self._outbound_ready.set()
+
     async def _outbound_audio_loop(self) -> None:
         """Background task to send queued audio to Twilio."""
         logger.info("Starting outbound audio loop")
         try:
             while self._running:
-                try:
-                    # Wait for audio with timeout to allow checking _running
-                    audio = await asyncio.wait_for(
-                        self._outbound_queue.get(),
-                        timeout=0.1
-                    )
-                    await self.send_audio(audio)
-                except asyncio.TimeoutError:
+                if not self._outbound_audio:
+                    # Woken by new audio or by _stop()
+                    self._outbound_ready.clear()
+                    await self._outbound_ready.wait()
                     continue
+                await self.send_audio(self._take_outbound_batch())
 
             # Drain any remaining audio in queue
-            while not self._outbound_queue.empty():
-                try:
-                    audio = self._outbound_queue.get_nowait()
-                    await self.send_audio(audio)
-                except asyncio.QueueEmpty:
-                    break
+            while self._outbound_audio:
+                await self.send_audio(self._take_outbound_batch())
 
         except asyncio.CancelledError:
             logger.info("Outbound audio loop cancelled")
@@ -461,21 +627,14 @@ class TwilioMediaHandler:
         if not self.stream_sid:
             return
 
-        payload = base64.b64encode(audio).decode("utf-8")
-        message = {
-            "event": "media",
-            "streamSid": self.stream_sid,
-            "media": {"payload": payload},
-        }
-        await self.websocket.send_json(message)
+        # binascii directly - base64.b64encode is a Python wrapper around it.
+        # Base64 needs no JSON escaping, so it drops straight into the envelope.
+        payload = binascii.b2a_base64(audio, newline=False).decode("ascii")
+        await self.websocket.send_text(self._media_prefix + payload + '"}}')
 
     async def _send_clear(self) -> None:
         """Send clear message to stop Twilio's audio playback."""
         if not self.stream_sid:
             return
 
-        message = {
-            "event": "clear",
-            "streamSid": self.stream_sid,
-        }
-        await self.websocket.send_json(message)
+        await self.websocket.send_text(self._clear_message)
@@ -80,7 +80,7 @@ async def end_call(context: CallContext, details: EndCallDetails) -> dict:
     if call_summary:
         update_data["transcript_summary"] = call_summary
 
-    client.table("calls").update(update_data).eq("id", call_id).execute()
+    await client.table("calls").update(update_data).eq("id", call_id).execute_async()
 
     # If this call is part of a request, the orchestration layer will decide
     # whether to try the next restaurant or mark the request as failed
@@ -91,7 +91,7 @@ async def report_no_availability(context: CallContext, details: NoAvailabilityDe
     if not should_try_alternative:
         update_data["status"] = "failed"
 
-    client.table("calls").update(update_data).eq("id", call_id).execute()
+    await client.table("calls").update(update_data).eq("id", call_id).execute_async()
 
     # If this call is part of a request and we're not trying alternative, mark request as failed
     # (unless there are other restaurants to try - handled by orchestration logic)
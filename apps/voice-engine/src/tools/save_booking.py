@@ -4,13 +4,19 @@ Function calling tool for Gemini to save confirmed reservations.
 """
 
 import logging
-from datetime import datetime
+import re
+from datetime import date
 from typing import TypedDict
 
 from src.db import get_db_client
 
 logger = logging.getLogger(__name__)
 
+# Same inputs strptime("%Y-%m-%d") / strptime("%H:%M") accept, without
+# strptime's per-call format parsing and locale handling
+_DATE_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})", re.ASCII)
+_TIME_RE = re.compile(r"([01]?\d|2[0-3]):[0-5]?\d", re.ASCII)
+
 
 class BookingDetails(TypedDict, total=False):
     """Booking details from Gemini function call."""
@@ -88,10 +94,14 @@ async def save_booking(context: CallContext, booking: BookingDetails) -> dict:
     try:
         confirmed_date = booking["confirmed_date"]
         confirmed_time = booking["confirmed_time"]
-        # Validate date format
-        datetime.strptime(confirmed_date, "%Y-%m-%d")
+        # Validate date format (date() rejects impossible days like Feb 30)
+        match = _DATE_RE.fullmatch(confirmed_date)
+        if not match:
+            raise ValueError(f"date '{confirmed_date}' does not match YYYY-MM-DD")
+        date(*map(int, match.groups()))
         # Validate time format
-        datetime.strptime(confirmed_time, "%H:%M")
+        if not _TIME_RE.fullmatch(confirmed_time):
+            raise ValueError(f"time '{confirmed_time}' does not match HH:MM")
     except (KeyError, ValueError) as e:
         raise ValueError(f"Invalid date/time format: {e}")
 
@@ -101,7 +111,7 @@ async def save_booking(context: CallContext, booking: BookingDetails) -> dict:
 
     if not restaurant_name and restaurant_id:
         # Fetch restaurant name from database
-        result = client.table("restaurants").select("name").eq("id", restaurant_id).execute()
+        result = await client.table("restaurants").select("name").eq("id", restaurant_id).execute_async()
         if result.data:
             restaurant_name = result.data[0]["name"]
 
@@ -131,16 +141,19 @@ async def save_booking(context: CallContext, booking: BookingDetails) -> dict:
 
     logger.info(f"Saving reservation: {reservation}")
 
-    result = client.table("reservations").insert(reservation).execute()
-
-    # Update call status to completed
-    client.table("calls").update({"status": "completed"}).eq("id", call_id).execute()
-
-    # If this call is part of a request, update request status
+    # Save the reservation and mark the call (and its request) completed
+    # in a single transaction
+    queries = [
+        client.table("reservations").insert(reservation),
+        client.table("calls").update({"status": "completed"}).eq("id", call_id),
+    ]
     if context.get("request_id"):
-        client.table("reservation_requests").update(
-            {"status": "completed"}
-        ).eq("id", context["request_id"]).execute()
+        queries.append(
+            client.table("reservation_requests").update(
+                {"status": "completed"}
+            ).eq("id", context["request_id"])
+        )
+    result, *_ = await client.execute_all_async(queries)
 
     reservation_data = result.data[0] if result.data else {}
     logger.info(f"Reservation saved successfully: {reservation_data.get('id')}")
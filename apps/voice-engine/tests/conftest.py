@@ -7,10 +7,12 @@ import base64
 import json
 import os
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import AsyncGenerator, Callable, Generator
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
+import numpy as np
 import pytest
 import pytest_asyncio
 from fastapi import WebSocket
@@ -36,22 +38,22 @@ os.environ.setdefault("TWILIO_PHONE_NUMBER", "+15551234567")
 # ============================================================================
 
 SAMPLE_USER = {
-    "id": "user-uuid-123",
+    "id": "1b9d6bcd-bbfd-4b2d-9b5d-ab8dfbbd4bed",
     "name": "John Doe",
     "email": "john@example.com",
     "phone": "+15559876543",
 }
 
 SAMPLE_RESTAURANT = {
-    "id": "restaurant-uuid-456",
+    "id": "6ec0bd7f-11c0-43da-975e-2a8ad9ebae0b",
     "name": "Le Petit Bistro",
     "phone": "+15551112222",
     "address": "123 Main St",
 }
 
 SAMPLE_RESERVATION_REQUEST = {
-    "id": "request-uuid-789",
-    "user_id": "user-uuid-123",
+    "id": "c9bf9e57-1685-4c89-bafb-ff5af830be8a",
+    "user_id": "1b9d6bcd-bbfd-4b2d-9b5d-ab8dfbbd4bed",
     "status": "pending",
     "party_size": 4,
     "requested_date": "2024-02-15",
@@ -66,6 +68,13 @@ SAMPLE_RESERVATION_REQUEST = {
 # ============================================================================
 
 
+@dataclass
+class MockQueryResult:
+    """Query result carrying rows in .data, like QueryResult."""
+
+    data: list = field(default_factory=list)
+
+
 class MockQueryBuilder:
     """Mock Supabase query builder for chaining."""
 
@@ -94,7 +103,7 @@ class MockQueryBuilder:
 
     def execute(self):
         """Execute the query and return mock response."""
-        result = MagicMock()
+        result = MockQueryResult()
 
         if self._data and not self._filters:
             # INSERT operation
@@ -130,6 +139,10 @@ class MockQueryBuilder:
 
         return result
 
+    async def execute_async(self):
+        """Async variant of execute(), mirroring TableQuery.execute_async."""
+        return self.execute()
+
 
 class MockDatabaseClient:
     """Mock database client that stores data in memory."""
@@ -152,6 +165,10 @@ class MockDatabaseClient:
     def table(self, name: str) -> MockQueryBuilder:
         return MockQueryBuilder(name, self._data_store)
 
+    async def execute_all_async(self, queries: list) -> list:
+        """Mirror PostgresClient.execute_all_async by running queries in order."""
+        return [query.execute() for query in queries]
+
     def get_data(self, table: str) -> list:
         """Helper to inspect stored data in tests."""
         return self._data_store.get(table, [])
@@ -185,7 +202,6 @@ class MockRedisClient:
 
 
 # Aliases for backward compatibility
-MockQueryResult = MagicMock  # Used by test_outbound_call.py
 MockTableQuery = MockQueryBuilder  # Used by test_outbound_call.py
 
 
@@ -221,7 +237,7 @@ def mock_twilio_client(mocker):
     mock_client = Mock()
     mock_client.calls.create.return_value = mock_call
 
-    mocker.patch("main.TwilioClient", return_value=mock_client)
+    mocker.patch("twilio.rest.Client", return_value=mock_client)
     return mock_client
 
 
@@ -230,6 +246,52 @@ def mock_twilio_client(mocker):
 # ============================================================================
 
 
+# Plain response objects shaped like the google-genai Live types that
+# GeminiLiveClient.receive_audio reads (cheaper than MagicMock trees)
+
+
+@dataclass
+class MockFunctionCall:
+    name: str
+    id: str
+    args: dict
+
+
+@dataclass
+class MockToolCall:
+    function_calls: list[MockFunctionCall]
+
+
+@dataclass
+class MockInlineData:
+    data: bytes
+
+
+@dataclass
+class MockPart:
+    inline_data: MockInlineData | None = None
+
+
+@dataclass
+class MockModelTurn:
+    parts: list[MockPart]
+
+
+@dataclass
+class MockServerContent:
+    model_turn: MockModelTurn | None = None
+    turn_complete: bool = False
+    interrupted: bool = False
+    input_transcription: str | None = None
+    output_transcription: str | None = None
+
+
+@dataclass
+class MockResponse:
+    tool_call: MockToolCall | None = None
+    server_content: MockServerContent | None = None
+
+
 class MockGeminiSession:
     """Mock Gemini Live API session."""
 
@@ -268,42 +330,20 @@ class MockGeminiSession:
         """Generate mock responses including audio and tool calls."""
         # First yield any pending tool calls
         for name, tool_id, args in self._tool_calls:
-            response = MagicMock()
-            response.tool_call = MagicMock()
-            fc = MagicMock()
-            fc.name = name
-            fc.id = tool_id
-            fc.args = args
-            response.tool_call.function_calls = [fc]
-            response.server_content = None
-            yield response
+            yield MockResponse(
+                tool_call=MockToolCall([MockFunctionCall(name=name, id=tool_id, args=args)])
+            )
 
         # Then yield audio responses
         for audio in self._audio_responses:
-            response = MagicMock()
-            response.tool_call = None
-            response.server_content = MagicMock()
-            response.server_content.model_turn = MagicMock()
-            response.server_content.turn_complete = False
-            response.server_content.interrupted = False
-            response.server_content.input_transcription = None
-
-            part = MagicMock()
-            part.inline_data = MagicMock()
-            part.inline_data.data = audio
-            response.server_content.model_turn.parts = [part]
-
-            yield response
+            yield MockResponse(
+                server_content=MockServerContent(
+                    model_turn=MockModelTurn([MockPart(MockInlineData(audio))])
+                )
+            )
 
         # Final turn complete
-        response = MagicMock()
-        response.tool_call = None
-        response.server_content = MagicMock()
-        response.server_content.model_turn = None
-        response.server_content.turn_complete = True
-        response.server_content.interrupted = False
-        response.server_content.input_transcription = None
-        yield response
+        yield MockResponse(server_content=MockServerContent(turn_complete=True))
 
     def queue_audio(self, audio: bytes):
         """Queue audio to be returned by receive()."""
@@ -321,6 +361,7 @@ class MockGeminiClient:
         self._mock_session = MockGeminiSession()
         self.session = self._mock_session
         self._on_tool_call_callback: Callable | None = None
+        self._on_interrupted_callback: Callable | None = None
         self._connected = False
         self._tool_responses: list[dict] = []
 
@@ -332,7 +373,7 @@ class MockGeminiClient:
     async def send_audio(self, audio_chunk: bytes):
         """Mock send_audio."""
         if self.session:
-            await self.session.send_realtime_input(MagicMock(data=audio_chunk))
+            await self.session.send_realtime_input(MockInlineData(audio_chunk))
 
     async def send_text(self, text: str):
         """Mock send_text."""
@@ -365,6 +406,10 @@ class MockGeminiClient:
         """Register tool call callback."""
         self._on_tool_call_callback = callback
 
+    def on_interrupted(self, callback: Callable):
+        """Register interrupted callback."""
+        self._on_interrupted_callback = callback
+
     async def send_tool_response(self, function_call_id: str, tool_name: str, result: dict):
         """Mock send_tool_response."""
         self._tool_responses.append({
@@ -423,6 +468,9 @@ class MockWebSocket:
     async def send_json(self, data: dict):
         self._outgoing.append(data)
 
+    async def send_text(self, data: str):
+        self._outgoing.append(json.loads(data))
+
     async def receive_text(self) -> str:
         return await self._incoming.get()
 
@@ -473,7 +521,7 @@ def mock_websocket():
 def generate_mulaw_silence(duration_ms: int = 100, sample_rate: int = 8000) -> bytes:
     """Generate silent μ-law audio."""
     num_samples = int(sample_rate * duration_ms / 1000)
-    return bytes([0xFF] * num_samples)
+    return b"\xff" * num_samples
 
 
 def generate_pcm_silence(duration_ms: int = 100, sample_rate: int = 16000) -> bytes:
@@ -482,14 +530,31 @@ def generate_pcm_silence(duration_ms: int = 100, sample_rate: int = 16000) -> by
     return bytes(num_samples * 2)
 
 
+def generate_pcm_tone(
+    duration_ms: int = 100,
+    sample_rate: int = 16000,
+    frequency: float = 440.0,
+    amplitude: int = 8000,
+) -> bytes:
+    """Generate a 16-bit PCM sine tone."""
+    num_samples = int(sample_rate * duration_ms / 1000)
+    t = np.arange(num_samples) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype("<i2").tobytes()
+
+
+# Immutable, so every test can share the same objects
+MULAW_SILENCE_100MS = generate_mulaw_silence()
+PCM_SILENCE_100MS = generate_pcm_silence()
+
+
 @pytest.fixture
 def mulaw_silence():
-    return generate_mulaw_silence()
+    return MULAW_SILENCE_100MS
 
 
 @pytest.fixture
 def pcm_audio():
-    return generate_pcm_silence()
+    return PCM_SILENCE_100MS
 
 
 # ============================================================================
@@ -556,11 +621,13 @@ def sample_call_context():
 @pytest.fixture
 def app_with_mocks(mock_db_with_data, mock_redis):
     """Configure app with mock dependencies."""
-    from main import app, _call_context_store
+    from main import app, _call_context_store, _local_context_cache
 
     app.state.db = mock_db_with_data
     app.state.redis = mock_redis
+    app.state.twilio = None  # Recreated lazily so tests can patch TwilioClient
     _call_context_store.clear()
+    _local_context_cache.clear()
     return app
 
 
@@ -17,8 +17,8 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.stream.twilio_handler import TwilioMediaHandler
-from src.tools import save_booking, report_no_availability, end_call, CallContext
+from src.stream.twilio_handler import TOOL_EXECUTORS, TwilioMediaHandler
+from src.tools import ALL_TOOL_SCHEMAS, save_booking, report_no_availability, end_call, CallContext
 from tests.conftest import generate_mulaw_silence
 
 
@@ -404,10 +404,109 @@ class TestConcurrencyErrors:
         responses = mock_gemini.get_tool_responses()
         assert len(responses) == 2
 
+    async def test_tool_calls_run_in_order(self, mock_db, mock_websocket):
+        """Test queued tool calls execute one at a time in the order Gemini made them."""
+        handler = TwilioMediaHandler(
+            websocket=mock_websocket,
+            db=mock_db,
+        )
+
+        executed = []
+
+        async def record(tool_id, args):
+            executed.append(tool_id)
+            await asyncio.sleep(0)
+
+        handler._execute_save_booking = record
+        handler._execute_end_call = record
+
+        worker = asyncio.create_task(handler._tool_worker())
+        handler._handle_tool_call("save_booking", "tool-1", {})
+        handler._handle_tool_call("end_call", "tool-2", {})
+        handler._tool_queue.put_nowait(None)
+        await worker
+
+        assert executed == ["tool-1", "tool-2"]
+
+    async def test_failed_tool_call_does_not_stop_later_calls(
+        self, mock_db, mock_websocket, mock_gemini
+    ):
+        """Test a tool call that raises doesn't stop the ones queued after it."""
+        handler = TwilioMediaHandler(
+            websocket=mock_websocket,
+            db=mock_db,
+        )
+        handler._gemini = mock_gemini  # No call_id: executors report the error
+        mock_gemini.send_tool_response = AsyncMock(
+            side_effect=[ConnectionError("socket closed"), None]
+        )
+
+        worker = asyncio.create_task(handler._tool_worker())
+        handler._handle_tool_call("save_booking", "tool-1", {})
+        handler._handle_tool_call("end_call", "tool-2", {})
+        handler._tool_queue.put_nowait(None)
+        await asyncio.wait_for(worker, timeout=5)
+
+        assert handler._tool_queue.qsize() == 0
+        sent_ids = [c.args[0] for c in mock_gemini.send_tool_response.await_args_list]
+        assert sent_ids == ["tool-1", "tool-2"]
+
+    async def test_hung_tool_call_does_not_block_teardown(
+        self, mock_db, mock_websocket, mock_gemini
+    ):
+        """Test stream teardown cancels a tool call that never finishes."""
+        handler = TwilioMediaHandler(
+            websocket=mock_websocket,
+            db=mock_db,
+        )
+
+        cancelled = []
+
+        async def hang(tool_id, args):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(tool_id)
+                raise
+
+        handler._execute_save_booking = hang
+        handler._handle_tool_call("save_booking", "tool-1", {})
+        mock_websocket.close_stream()
+
+        with patch("src.stream.twilio_handler.TOOL_DRAIN_TIMEOUT_SECONDS", 0.05):
+            await asyncio.wait_for(handler.handle_stream(mock_gemini), timeout=5)
+
+        assert cancelled == ["tool-1"]
+
+    def test_every_declared_tool_has_an_executor(self):
+        """Test each tool schema sent to Gemini maps to a handler method."""
+        declared = {schema["name"] for schema in ALL_TOOL_SCHEMAS}
+
+        assert declared == set(TOOL_EXECUTORS)
+        for method_name in TOOL_EXECUTORS.values():
+            assert callable(getattr(TwilioMediaHandler, method_name))
+
 
 class TestEdgeCases:
     """Test edge cases and boundary conditions."""
 
+    @pytest.mark.parametrize(
+        "columns", ["count(*)", "name, restaurants(name)", "alias:name", "name::text"]
+    )
+    def test_select_rejects_non_column_expressions(self, columns):
+        """Test select() rejects syntax it would otherwise quote into a bad identifier."""
+        from src.db.client import TableQuery
+
+        with pytest.raises(ValueError, match="Unsupported select column"):
+            TableQuery(None, "restaurants").select(columns)
+
+    def test_select_accepts_bare_columns(self):
+        """Test select() takes '*' and comma-separated column names."""
+        from src.db.client import TableQuery
+
+        TableQuery(None, "restaurants").select("*")
+        TableQuery(None, "restaurants").select("id, name")
+
     async def test_empty_audio_ignored(self, mock_db, mock_websocket, mock_gemini):
         """Test that empty audio chunks are ignored."""
         handler = TwilioMediaHandler(
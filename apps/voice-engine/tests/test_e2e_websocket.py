@@ -504,3 +504,108 @@ class TestOutboundAudio:
         assert len(outgoing) == 1
         assert outgoing[0]["event"] == "clear"
         assert outgoing[0]["streamSid"] == "MZ-clear-test"
+
+    async def test_interrupted_drops_queued_audio(self, mock_db, mock_websocket):
+        """Test that Gemini's interrupted signal flushes queued audio and clears playback."""
+        handler = TwilioMediaHandler(
+            websocket=mock_websocket,
+            db=mock_db,
+        )
+
+        handler.stream_sid = "MZ-barge-in"
+        for _ in range(3):
+            handler._queue_outbound_audio(generate_mulaw_silence(duration_ms=20))
+        handler._is_speaking = True
+
+        handler._handle_interrupted()
+        await asyncio.gather(*handler._clear_tasks)  # Let the clear task run
+        await asyncio.sleep(0)  # ...and its done-callback
+
+        assert not handler._outbound_audio
+        assert handler._is_speaking is False
+        outgoing = mock_websocket.get_outgoing()
+        assert [msg["event"] for msg in outgoing] == ["clear"]
+        assert not handler._clear_tasks  # Finished task was released
+
+    async def test_outbound_queue_drops_oldest_when_full(self, mock_db, mock_websocket):
+        """Test that a backed-up outbound queue keeps the newest audio."""
+        from src.stream.twilio_handler import OUTBOUND_QUEUE_MAX_BYTES
+
+        handler = TwilioMediaHandler(
+            websocket=mock_websocket,
+            db=mock_db,
+        )
+
+        max_frames = OUTBOUND_QUEUE_MAX_BYTES // 160
+        for i in range(max_frames + 5):
+            handler._queue_outbound_audio(bytes([i]) * 160)
+
+        assert len(handler._outbound_audio) == max_frames
+        assert handler._outbound_bytes == OUTBOUND_QUEUE_MAX_BYTES
+        assert handler._dropped_bytes == 5 * 160
+        assert handler._outbound_audio[0] == bytes([5]) * 160
+
+    async def test_outbound_queue_caps_bytes_not_chunks(self, mock_db, mock_websocket):
+        """Test that the queue bound holds for large coalesced chunks."""
+        from src.stream.twilio_handler import OUTBOUND_QUEUE_MAX_BYTES
+
+        handler = TwilioMediaHandler(
+            websocket=mock_websocket,
+            db=mock_db,
+        )
+
+        big = OUTBOUND_QUEUE_MAX_BYTES // 2 + 160
+        for i in range(3):
+            handler._queue_outbound_audio(bytes([i]) * big)
+
+        # Two big chunks would exceed the cap, so only the newest remains
+        assert list(handler._outbound_audio) == [bytes([2]) * big]
+        assert handler._outbound_bytes == big
+
+        batch = handler._take_outbound_batch()
+        assert batch == bytes([2]) * big
+        assert handler._outbound_bytes == 0
+
+    async def test_long_silence_not_forwarded(self, mock_db, mock_websocket):
+        """Test that silence is gated after the hangover and speech reopens the gate with preroll."""
+        from src.stream.twilio_handler import SILENCE_HANGOVER_FRAMES, SILENCE_PREROLL_FRAMES
+
+        handler = TwilioMediaHandler(
+            websocket=mock_websocket,
+            db=mock_db,
+        )
+
+        # Distinct quiet frames (all below the threshold) so the preroll order is checkable
+        silence = [n.to_bytes(2, "little", signed=True) * 320 for n in range(SILENCE_HANGOVER_FRAMES + 10)]
+        speech = (1000).to_bytes(2, "little", signed=True) * 320
+
+        forwarded = [handler._gate_inbound(frame) for frame in silence]
+        assert sum(1 for audio in forwarded if audio) == SILENCE_HANGOVER_FRAMES
+        assert forwarded[-1] == b""
+
+        # The last gated frames are sent ahead of the speech that reopens the gate
+        assert handler._gate_inbound(speech) == b"".join(silence[-SILENCE_PREROLL_FRAMES:]) + speech
+        assert handler._gate_inbound(silence[0]) == silence[0]
+        assert handler._gate_inbound(speech) == speech
+
+    async def test_queued_audio_sent_as_one_message(self, mock_db, mock_websocket):
+        """Test that audio already queued is merged into a single media message."""
+        handler = TwilioMediaHandler(
+            websocket=mock_websocket,
+            db=mock_db,
+        )
+
+        handler.stream_sid = "MZ-batch"
+        chunks = [bytes([i]) * 160 for i in range(3)]
+        for chunk in chunks:
+            handler._queue_outbound_audio(chunk)
+
+        handler._running = True
+        task = asyncio.create_task(handler._outbound_audio_loop())
+        await asyncio.sleep(0.01)
+        handler._stop()
+        await task
+
+        outgoing = mock_websocket.get_outgoing()
+        assert len(outgoing) == 1
+        assert base64.b64decode(outgoing[0]["media"]["payload"]) == b"".join(chunks)
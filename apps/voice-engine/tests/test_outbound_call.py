@@ -8,6 +8,7 @@ Tests cover:
 4. Error handling and validation
 """
 
+import asyncio
 import json
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
@@ -15,6 +16,7 @@ from unittest.mock import Mock, patch, AsyncMock
 from main import (
     app,
     _call_context_store,
+    _local_context_cache,
     _get_call_context,
     _store_call_context,
 )
@@ -62,7 +64,7 @@ class TestOutboundCallEndpoint:
         response = await async_client.post(
             "/api/calls/outbound",
             json={
-                "request_id": "nonexistent-uuid",
+                "request_id": "00000000-0000-4000-8000-000000000001",
                 "restaurant_id": SAMPLE_RESTAURANT["id"],
             },
         )
@@ -80,7 +82,7 @@ class TestOutboundCallEndpoint:
             "/api/calls/outbound",
             json={
                 "request_id": SAMPLE_RESERVATION_REQUEST["id"],
-                "restaurant_id": "nonexistent-uuid",
+                "restaurant_id": "00000000-0000-4000-8000-000000000002",
             },
         )
 
@@ -158,6 +160,21 @@ class TestOutboundCallEndpoint:
         # Check in-memory fallback since Redis mock might not be fully wired
         assert len(_call_context_store) >= 0  # Context was processed
 
+    async def test_initiate_outbound_call_caches_restaurant(
+        self, async_client, app_with_mocks, mock_twilio_client, sample_outbound_request
+    ):
+        """Test restaurant rows are served from Redis on repeat calls."""
+        response = await async_client.post("/api/calls/outbound", json=sample_outbound_request)
+        assert response.status_code == 200
+
+        # Let the background cache write finish, then drop the row from the DB
+        await asyncio.sleep(0)
+        app_with_mocks.state.db._tables["restaurants"] = []
+
+        response = await async_client.post("/api/calls/outbound", json=sample_outbound_request)
+        assert response.status_code == 200
+        assert mock_twilio_client.calls.create.call_count == 2
+
     async def test_initiate_outbound_call_no_database(self, async_client, app_with_mocks):
         """Test 503 when database is not available."""
         app_with_mocks.state.db = None
@@ -165,14 +182,27 @@ class TestOutboundCallEndpoint:
         response = await async_client.post(
             "/api/calls/outbound",
             json={
-                "request_id": "any-uuid",
-                "restaurant_id": "any-uuid",
+                "request_id": SAMPLE_RESERVATION_REQUEST["id"],
+                "restaurant_id": SAMPLE_RESTAURANT["id"],
             },
         )
 
         assert response.status_code == 503
         assert "Database not available" in response.json()["detail"]
 
+    async def test_initiate_outbound_call_invalid_uuid(self, async_client, mock_twilio_client):
+        """Test malformed IDs are rejected before any database lookup."""
+        response = await async_client.post(
+            "/api/calls/outbound",
+            json={
+                "request_id": "not-a-uuid",
+                "restaurant_id": SAMPLE_RESTAURANT["id"],
+            },
+        )
+
+        assert response.status_code == 422
+        mock_twilio_client.calls.create.assert_not_called()
+
 
 class TestOutboundTwiMLWebhook:
     """Tests for POST /ws/twilio/outbound-twiml webhook."""
@@ -294,6 +324,24 @@ class TestContextStorage:
         retrieved = await _get_call_context(failing_redis, context_id)
         assert retrieved == sample_call_context
 
+    async def test_local_cache_skips_redis(self, sample_call_context):
+        """Test stored contexts are served from the local cache, but misses are not cached."""
+        _local_context_cache.clear()
+        counting_redis = Mock()
+        counting_redis.get = AsyncMock(return_value=None)
+        counting_redis.setex = AsyncMock()
+
+        await _store_call_context(counting_redis, "local-hit-123", sample_call_context)
+        assert await _get_call_context(counting_redis, "local-hit-123") == sample_call_context
+        counting_redis.get.assert_not_called()
+
+        # Misses go back to Redis, so a context written by another worker
+        # after the first lookup is still found
+        assert await _get_call_context(counting_redis, "local-miss-456") is None
+        counting_redis.get.return_value = json.dumps(sample_call_context).encode()
+        assert await _get_call_context(counting_redis, "local-miss-456") == sample_call_context
+        assert counting_redis.get.await_count == 2
+
 
 class TestHealthEndpoint:
     """Tests for health check endpoint."""
@@ -371,6 +419,32 @@ class TestPromptGeneration:
 
         assert "None" in prompt  # Default for empty special_requests
 
+    def test_build_outbound_prompt_is_cached(self):
+        """Test repeat calls reuse the formatted prompt, with "" and None sharing an entry."""
+        from src.brain.prompts import build_outbound_prompt
+
+        args = dict(
+            user_name="Jane Doe",
+            restaurant_name="Chez Marie",
+            party_size=2,
+            preferred_date="2024-03-01",
+            preferred_time="19:00",
+            time_range_start="19:00",
+            time_range_end="21:00",
+            contact_phone="+15551234567",
+        )
+
+        first = build_outbound_prompt(**args, special_requests="")
+        assert build_outbound_prompt(**args, special_requests=None) is first
+
+    @pytest.mark.parametrize("template", ["{x:>5}", "{x!r}", "{x.attr}", "{x[0]}", "{}"])
+    def test_compile_template_rejects_unsupported_fields(self, template):
+        """Test fields _render can't honour fail loudly instead of being dropped."""
+        from src.brain.prompts import _compile_template
+
+        with pytest.raises(ValueError, match="Unsupported template field"):
+            _compile_template(template)
+
 
 class TestGeminiClientPrompt:
     """Tests for GeminiLiveClient system prompt handling."""
@@ -392,6 +466,63 @@ class TestGeminiClientPrompt:
         assert client._system_prompt == custom_prompt
 
 
+class TestGeminiClientAudio:
+    """Tests for GeminiLiveClient audio output framing."""
+
+    async def test_receive_audio_coalesces_into_frames(self):
+        """Test small chunks are yielded as whole frames plus an end-of-turn flush."""
+        from src.brain.gemini_client import GeminiLiveClient
+        from tests.conftest import MockGeminiSession
+
+        client = GeminiLiveClient(output_frame_bytes=960)
+        client.session = MockGeminiSession()
+        for _ in range(3):
+            client.session.queue_audio(bytes(400))
+
+        sizes = []
+        audio = client.receive_audio()
+        async for chunk in audio:
+            sizes.append(len(chunk))
+            if sum(sizes) >= 1200:
+                break
+        await audio.aclose()
+
+        assert sizes == [960, 240]
+
+    async def test_send_audio_coalesces_small_chunks(self):
+        """Test sub-frame input chunks are batched, and whole frames pass straight through."""
+        from src.brain.gemini_client import GeminiLiveClient, INPUT_FRAME_BYTES, SEND_COALESCE_SECONDS
+        from tests.conftest import MockGeminiSession
+
+        client = GeminiLiveClient()
+        session = client.session = MockGeminiSession()
+
+        await client.send_audio(bytes(INPUT_FRAME_BYTES))
+        for _ in range(3):
+            await client.send_audio(bytes(INPUT_FRAME_BYTES // 4))
+        assert [len(m) for m in session._received_audio] == [INPUT_FRAME_BYTES]
+
+        # The remaining partial frame is flushed once the window passes
+        await asyncio.sleep(SEND_COALESCE_SECONDS * 3)
+        assert [len(m) for m in session._received_audio] == [
+            INPUT_FRAME_BYTES, 3 * INPUT_FRAME_BYTES // 4,
+        ]
+
+    async def test_close_flushes_buffered_audio(self):
+        """Test close() sends a pending partial frame instead of dropping it."""
+        from src.brain.gemini_client import GeminiLiveClient, INPUT_FRAME_BYTES
+        from tests.conftest import MockGeminiSession
+
+        client = GeminiLiveClient()
+        session = client.session = MockGeminiSession()
+
+        await client.send_audio(bytes(INPUT_FRAME_BYTES // 4))
+        await client.close()
+
+        assert [len(m) for m in session._received_audio] == [INPUT_FRAME_BYTES // 4]
+        assert client._send_flush_task is None
+
+
 class TestTwilioHandlerContext:
     """Tests for TwilioMediaHandler context handling."""
 
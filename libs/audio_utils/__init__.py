@@ -1,16 +1,24 @@
 from .transcode import (
+    mulaw_decode,
+    mulaw_encode,
     transcode_mulaw_to_pcm,
     transcode_pcm_to_mulaw,
     transcode_pcm_24k_to_mulaw,
+    transcode_pcm_24k_to_mulaw_stream,
+    pcm_peak,
     resample_8k_to_16k,
     resample_16k_to_8k,
     resample_24k_to_8k,
 )
 
 __all__ = [
+    "mulaw_decode",
+    "mulaw_encode",
     "transcode_mulaw_to_pcm",
     "transcode_pcm_to_mulaw",
     "transcode_pcm_24k_to_mulaw",
+    "transcode_pcm_24k_to_mulaw_stream",
+    "pcm_peak",
     "resample_8k_to_16k",
     "resample_16k_to_8k",
     "resample_24k_to_8k",
@@ -51,6 +51,36 @@ def _mulaw_encode_sample(pcm_sample: int) -> int:
     return mulaw_byte & 0xFF
 
 
+def _mulaw_encode_array(pcm_samples: np.ndarray) -> np.ndarray:
+    """Vectorized _mulaw_encode_sample over an integer array."""
+    samples = pcm_samples.astype(np.int32)
+    sign = np.where(samples < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(samples), MULAW_CLIP) + MULAW_BIAS
+
+    # Smallest exponent with magnitude < 1 << (exponent + 8)
+    exponent = np.clip(np.frexp(magnitude)[1] - 8, 0, 7)
+
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+# Lookup tables replace the per-sample Python codec loops: 256 entries for
+# decode, and one entry per 16-bit sample (indexed by its uint16 bit pattern)
+# for encode - each frame becomes a single vectorized gather.
+_MULAW_DECODE_TABLE = np.array([_mulaw_decode_sample(b) for b in range(256)], dtype=np.int16)
+_MULAW_ENCODE_TABLE = _mulaw_encode_array(np.arange(65536, dtype=np.uint16).view(np.int16))
+
+
+def mulaw_decode(mulaw_audio: bytes) -> np.ndarray:
+    """Decode μ-law bytes to 16-bit linear PCM samples."""
+    return _MULAW_DECODE_TABLE[np.frombuffer(mulaw_audio, dtype=np.uint8)]
+
+
+def mulaw_encode(pcm_samples: np.ndarray) -> bytes:
+    """Encode 16-bit linear PCM samples to μ-law bytes."""
+    return _MULAW_ENCODE_TABLE[pcm_samples.astype(np.int16, copy=False).view(np.uint16)].tobytes()
+
+
 def transcode_mulaw_to_pcm(mulaw_audio: bytes) -> bytes:
     """
     Convert μ-law 8kHz audio to 16-bit LPCM 16kHz.
@@ -62,10 +92,7 @@ def transcode_mulaw_to_pcm(mulaw_audio: bytes) -> bytes:
         16-bit signed LPCM audio bytes (16kHz)
     """
     # Decode μ-law to 16-bit PCM
-    pcm_samples = np.array(
-        [_mulaw_decode_sample(b) for b in mulaw_audio],
-        dtype=np.int16
-    )
+    pcm_samples = mulaw_decode(mulaw_audio)
 
     # Resample 8kHz -> 16kHz (simple linear interpolation)
     resampled = resample_8k_to_16k(pcm_samples)
@@ -90,9 +117,24 @@ def transcode_pcm_to_mulaw(pcm_audio: bytes) -> bytes:
     resampled = resample_16k_to_8k(pcm_samples)
 
     # Encode to μ-law
-    mulaw_bytes = bytes([_mulaw_encode_sample(int(s)) for s in resampled])
+    return mulaw_encode(resampled)
+
+
+def pcm_peak(pcm_audio: bytes) -> int:
+    """
+    Peak absolute sample value of 16-bit LPCM audio.
 
-    return mulaw_bytes
+    Args:
+        pcm_audio: 16-bit signed LPCM audio bytes
+
+    Returns:
+        Largest absolute sample value (0 for empty input)
+    """
+    samples = np.frombuffer(pcm_audio, dtype=np.int16)
+    if samples.size == 0:
+        return 0
+    # Compare as ints - abs() of int16 -32768 overflows
+    return max(int(samples.max()), -int(samples.min()))
 
 
 def resample_8k_to_16k(samples: np.ndarray) -> np.ndarray:
@@ -181,6 +223,39 @@ def transcode_pcm_24k_to_mulaw(pcm_audio: bytes) -> bytes:
     resampled = resample_24k_to_8k(pcm_samples)
 
     # Encode to μ-law
-    mulaw_bytes = bytes([_mulaw_encode_sample(int(s)) for s in resampled])
+    return mulaw_encode(resampled)
+
+
+def transcode_pcm_24k_to_mulaw_stream(
+    pcm_audio: bytes, history: np.ndarray | None = None
+) -> tuple[bytes, np.ndarray | None]:
+    """
+    Convert one chunk of a 16-bit LPCM 24kHz stream to μ-law 8kHz.
 
-    return mulaw_bytes
+    Filters, decimates and encodes in a single pass, computing the 3-tap
+    moving average only at the kept (every 3rd) sample positions. The
+    samples a chunk can't finish are carried to the next call, so chunk
+    boundaries don't produce edge artifacts.
+
+    Args:
+        pcm_audio: 16-bit signed LPCM audio bytes (24kHz)
+        history: State returned by the previous call (None for a new stream)
+
+    Returns:
+        Tuple of (raw μ-law encoded audio bytes (8kHz), state for the next call)
+    """
+    samples = np.frombuffer(pcm_audio, dtype=np.int16)
+    if history is None:
+        if samples.size == 0:
+            return b"", None
+        # Edge-pad the very first sample, as resample_24k_to_8k does
+        history = samples[:1]
+    samples = np.concatenate((history, samples))
+
+    # samples[0] is the carried tap before this chunk; output k averages
+    # samples[3k:3k + 3], centred on samples[3k + 1]
+    n_out = (samples.size - 1) // 3
+    taps = samples[: 1 + 3 * n_out].astype(np.int32)
+    filtered = (taps[0:-1:3] + taps[1::3] + taps[2::3]) // 3
+
+    return mulaw_encode(filtered), samples[3 * n_out:]